@@ -1,5 +1,7 @@
 # app.py
 import json
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict, Any
 
 import pandas as pd
@@ -11,7 +13,9 @@ from utils import (
     BrandInfo,
     PageDefinition,
     SEOEntry,
+    SITEMAP_COLUMNS,
     build_site_export,
+    export_bytes,
     load_text_from_upload,
     parse_keywords,
     parse_seo_csv,
@@ -26,7 +30,7 @@ from generation_pipeline import (
     refine_draft,
 )
 from prompt_builder import analyze_homepage_copy, build_hybrid_prompt, build_query_text
-from rule_storage import RuleChunk, RuleStore, load_core_rules
+from rule_storage import RetrievedRule, RuleChunk, RuleStore, load_core_rules
 from golden_rules import embed_rule_chunks, split_into_chunks
 
 
@@ -37,6 +41,7 @@ st.set_page_config(
 
 CORE_RULE_PATH = "docs/core_rules.json"
 RULE_STORE_PATH = ".cache/golden_rules/index"
+MAX_PAGE_WORKERS = 8
 
 
 def generate_service_keywords(
@@ -579,6 +584,7 @@ def main():
             st.header("2. Sitemap / Pages")
 
             allowed_page_types = ["home", "service", "sub service", "about", "location"]
+            allowed_page_type_set = frozenset(allowed_page_types)
 
             st.caption(
                 "Upload a sitemap CSV with columns: `slug`, `page_name`, `page_type` "
@@ -594,9 +600,10 @@ def main():
 
             sitemap_warnings = []
             if sitemap_file is not None:
-                pages_df, sitemap_warnings = parse_sitemap_csv(
+                sitemap_rows, sitemap_warnings = parse_sitemap_csv(
                     sitemap_file, allowed_page_types
                 )
+                pages_df = pd.DataFrame.from_records(sitemap_rows, columns=SITEMAP_COLUMNS)
             else:
                 # Fallback default sitemap
                 pages_df = pd.DataFrame(
@@ -806,9 +813,11 @@ def main():
                 [t for t in [brand_book_text, onboarding_text, home_page_text] if t.strip()]
             ).strip()
             service_offerings = [
-                str(row.get("page_name", "")).strip()
-                for _, row in pages_df.iterrows()
-                if str(row.get("page_type", "")).strip() in {"service", "sub service"}
+                str(page_name).strip()
+                for page_name, page_type in pages_df[["page_name", "page_type"]].itertuples(
+                    index=False, name=None
+                )
+                if str(page_type).strip() in {"service", "sub service"}
             ]
 
             keyword_doc_col1, keyword_doc_col2 = st.columns([1, 1])
@@ -1054,15 +1063,17 @@ def main():
                 page_definitions: List[PageDefinition] = []
                 unsupported_types = set()
 
-                for _, row in pages_df.iterrows():
-                    slug = str(row.get("slug", "")).strip()
-                    page_name = str(row.get("page_name", "")).strip()
-                    page_type = str(row.get("page_type", "")).strip()
+                for raw_slug, raw_page_name, raw_page_type in pages_df[
+                    ["slug", "page_name", "page_type"]
+                ].itertuples(index=False, name=None):
+                    slug = str(raw_slug).strip()
+                    page_name = str(raw_page_name).strip()
+                    page_type = sys.intern(str(raw_page_type).strip())
 
                     if not slug or not page_name or not page_type:
                         continue
 
-                    if page_type not in allowed_page_types:
+                    if page_type not in allowed_page_type_set:
                         unsupported_types.add(page_type)
                         continue
 
@@ -1081,63 +1092,76 @@ def main():
                 if not page_definitions:
                     st.error("Please define at least one valid page in the sitemap.")
                 else:
-                    st.session_state["results"] = []
+                    generation_kwargs = {
+                        "topic": page_topic,
+                        "paramount_keywords": paramount_keywords,
+                        "primary_keywords": primary_keywords,
+                        "brand_book": brand_book_text,
+                        "onboarding_notes": onboarding_text,
+                        "home_page_copy": home_page_text,
+                        "static_rules": st.session_state.get("static_rules", {}),
+                        "rule_store": rule_store,
+                        "audience_intent": audience_intent,
+                        "page_goal": page_goal,
+                        "golden_rule_text": st.session_state.get("golden_rule_text", ""),
+                        "golden_rule_mode": st.session_state.get("golden_rule_mode", "retrieval"),
+                        "top_rules": st.session_state.get("golden_rule_top_n", 12),
+                        "model_name": st.session_state.get("model_name", DEFAULT_MODEL_NAME),
+                    }
+                    page_results: List[Dict[str, Any]] = [
+                        {
+                            "page": page,
+                            "seo": seo_map.get(page.slug),
+                            "outline": None,
+                            "draft": None,
+                            "final": None,
+                        }
+                        for page in page_definitions
+                    ]
+
+                    # Pages are independent and dominated by API latency, so run them
+                    # concurrently. Streamlit calls stay on this thread; workers only
+                    # touch the shared (thread-safe) OpenAI client. Finished pages are
+                    # published to session state as they land so a rerun mid-batch keeps
+                    # them, and pending pages are cancelled instead of awaited.
+                    completed_results: List[Dict[str, Any]] = []
+                    st.session_state["results"] = completed_results
                     progress = st.progress(0.0)
-                    for idx, page in enumerate(page_definitions):
-                        st.markdown(f"#### Generating: {page.page_name} (`{page.slug}`)")
-                        with st.spinner(
-                            f"Generating outline, draft, and refinement for {page.page_name}..."
-                        ):
-                            seo_entry = seo_map.get(page.slug)
-
-                            outline = None
-                            draft = None
-                            final_json = None
-
-                            try:
-                                final_json = generate_medical_page(
+                    with st.spinner(f"Generating {len(page_definitions)} page(s)..."):
+                        executor = ThreadPoolExecutor(
+                            max_workers=min(MAX_PAGE_WORKERS, len(page_definitions))
+                        )
+                        try:
+                            futures = {
+                                executor.submit(
+                                    generate_medical_page,
                                     client,
                                     brand_info,
-                                    page,
-                                    seo_entry,
+                                    entry["page"],
+                                    entry["seo"],
                                     style_profile,
-                                    topic=page_topic,
-                                    paramount_keywords=paramount_keywords,
-                                    primary_keywords=primary_keywords,
-                                    brand_book=brand_book_text,
-                                    onboarding_notes=onboarding_text,
-                                    home_page_copy=home_page_text,
-                                    static_rules=st.session_state.get("static_rules", {}),
-                                    rule_store=rule_store,
-                                    audience_intent=audience_intent,
-                                    page_goal=page_goal,
-                                    golden_rule_text=st.session_state.get(
-                                        "golden_rule_text", ""
-                                    ),
-                                    golden_rule_mode=st.session_state.get(
-                                        "golden_rule_mode", "retrieval"
-                                    ),
-                                    top_rules=st.session_state.get("golden_rule_top_n", 12),
-                                    model_name=st.session_state.get(
-                                        "model_name", DEFAULT_MODEL_NAME
-                                    ),
-                                )
-                            except Exception as exc:
-                                st.error(
-                                    f"Error generating page for {page.page_name} ({page.slug}): {exc}"
-                                )
-
-                            st.session_state["results"].append(
-                                {
-                                    "page": page,
-                                    "seo": seo_entry,
-                                    "outline": outline,
-                                    "draft": draft,
-                                    "final": final_json,
-                                }
-                            )
-
-                        progress.progress((idx + 1) / len(page_definitions))
+                                    **generation_kwargs,
+                                ): entry
+                                for entry in page_results
+                            }
+                            for done, future in enumerate(as_completed(futures), start=1):
+                                entry = futures[future]
+                                page = entry["page"]
+                                try:
+                                    entry["final"] = future.result()
+                                    st.markdown(f"#### Generated: {page.page_name} (`{page.slug}`)")
+                                except Exception as exc:
+                                    st.error(
+                                        f"Error generating page for {page.page_name} ({page.slug}): {exc}"
+                                    )
+                                completed_results.append(entry)
+                                progress.progress(done / len(page_definitions))
+                        except BaseException:
+                            executor.shutdown(wait=False, cancel_futures=True)
+                            raise
+                        executor.shutdown()
+                    # Restore sitemap order once every page has finished.
+                    st.session_state["results"] = page_results
                     progress.empty()
 
         with col_right:
@@ -1189,7 +1213,7 @@ def main():
                         if final_json is not None:
                             st.download_button(
                                 label="Download page JSON",
-                                data=json.dumps(final_json, indent=2).encode("utf-8"),
+                                data=export_bytes(final_json),
                                 file_name=f"{page.slug.replace('/', '_')}.json",
                                 mime="application/json",
                                 use_container_width=True,
@@ -1202,10 +1226,9 @@ def main():
                 st.subheader("Download All Final Page JSONs")
 
                 site_export = build_site_export(results)
-                site_export_json = json.dumps(site_export, indent=2)
                 st.download_button(
                     label="Download site_copy.json",
-                    data=site_export_json.encode("utf-8"),
+                    data=export_bytes(site_export),
                     file_name="site_copy.json",
                     mime="application/json",
                 )
@@ -1686,7 +1709,7 @@ def main():
             lab_page = PageDefinition(
                 slug=lab_slug.strip() or "test-page",
                 page_name=lab_page_name.strip() or "Quick Test Page",
-                page_type=lab_page_type,
+                page_type=sys.intern(lab_page_type),
                 service_name=lab_selected_service if lab_page_type == "service" else None,
             )
             supporting_list = [
@@ -1704,7 +1727,7 @@ def main():
             lab_seo = SEOEntry(
                 slug=lab_page.slug,
                 primary_keyword=primary_keyword_value or None,
-                supporting_keywords=supporting_list,
+                supporting_keywords_raw=",".join(supporting_list),
             )
 
             try:
@@ -1937,8 +1960,9 @@ def main():
             seo_entry = None
             if page_primary_kw or supporting_keywords:
                 seo_entry = SEOEntry(
+                    slug=diag_slug.strip() or "services/diagnostic",
                     primary_keyword=page_primary_kw,
-                    supporting_keywords=supporting_keywords,
+                    supporting_keywords_raw=",".join(supporting_keywords),
                 )
 
             brand_info = BrandInfo(
@@ -1953,7 +1977,7 @@ def main():
             page = PageDefinition(
                 slug=diag_slug.strip() or "services/diagnostic",
                 page_name=diag_page_name.strip() or "Service Overview",
-                page_type=diag_page_type,
+                page_type=sys.intern(diag_page_type),
                 service_name=diag_service.strip() or None,
             )
 
@@ -1972,7 +1996,7 @@ def main():
                 diag_service,
             )
 
-            dynamic_rules: List[RuleChunk] = []
+            dynamic_rules: List[RetrievedRule] = []
             diag_page_tags = {
                 "home": ["structure", "tone", "cta"],
                 "service": ["seo", "structure", "cta"],
@@ -12,12 +12,13 @@ from prompt_builder import (
     build_hybrid_prompt,
     build_query_text,
 )
-from rule_storage import RuleChunk, RuleStore
+from rule_storage import RetrievedRule, RuleChunk, RuleStore
 from utils import (
     BrandInfo,
     PageDefinition,
     SEOEntry,
     get_page_schema,
+    get_page_validator,
     safe_json_loads,
     SchemaValidationError,
     validate_against_schema,
@@ -156,7 +157,7 @@ Task:
 
     raw = call_openai_json(client, messages, model_name=model_name)
     draft_json = safe_json_loads(raw)
-    validate_against_schema(page_schema, draft_json)
+    get_page_validator(page.page_type)(draft_json)
     return draft_json
 
 
@@ -175,7 +176,6 @@ def refine_draft(
     primary_kw = seo_entry.primary_keyword if seo_entry else None
     supporting_kws = seo_entry.supporting_keywords if seo_entry else []
 
-    page_schema = get_page_schema(page.page_type)
     example = get_example_for(style_profile, page.page_type)
     example_block = (
         f"\nReference example for tone/structure (do not copy wording):\n{json.dumps(example, indent=2)}"
@@ -229,7 +229,7 @@ Return ONLY the refined JSON object with the SAME structure.
     raw = call_openai_json(client, messages, model_name=model_name)
     refined_json = safe_json_loads(raw)
     try:
-        validate_against_schema(page_schema, refined_json)
+        get_page_validator(page.page_type)(refined_json)
     except SchemaValidationError as exc:
         raise SchemaValidationError(f"Refined draft schema mismatch: {exc}") from exc
     return refined_json
@@ -262,7 +262,7 @@ def generate_medical_page(
     supporting_kws = seo_entry.supporting_keywords if seo_entry else []
     service_focus = getattr(page, "service_name", None)
     target_keywords = list(
-        {kw: None for kw in primary_keywords + supporting_kws + ([service_focus] if service_focus else [])}.keys()
+        {kw: None for kw in [*primary_keywords, *supporting_kws, *([service_focus] if service_focus else [])]}.keys()
     )
     home_page_profile = analyze_homepage_copy(home_page_copy or brand_book)
     tone_hint = home_page_profile.get("tone_indicators", brand_info.voice_tone)
@@ -275,7 +275,7 @@ def generate_medical_page(
         service_focus or "",
     )
     use_full_rules = golden_rule_mode == "full_text" and golden_rule_text.strip()
-    dynamic_rules: List[RuleChunk] = []
+    dynamic_rules: List[RetrievedRule] = []
 
     page_tags = {
         "home": ["structure", "tone", "cta"],
@@ -11,7 +11,7 @@ import tiktoken
 from openai import OpenAI
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RuleChunk:
     text: str
     embedding: List[float]
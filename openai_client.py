@@ -1,7 +1,8 @@
 # openai_client.py
 import json
+import operator
 import os
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 import streamlit as st
 from openai import OpenAI
@@ -9,10 +10,10 @@ from openai import OpenAI
 from settings import DEFAULT_MODEL_NAME
 
 
-def _dedupe_prompt_lines(text: str, seen: Optional[set] = None) -> str:
+def _dedupe_prompt_lines(text: str, seen: Optional[Dict[str, None]] = None) -> str:
     """Remove duplicate non-empty lines and collapse redundant blanks."""
 
-    seen = seen if seen is not None else set()
+    seen = seen if seen is not None else {}
     deduped: List[str] = []
     last_blank = False
     changed = False
@@ -25,24 +26,26 @@ def _dedupe_prompt_lines(text: str, seen: Optional[set] = None) -> str:
                 changed = True
                 continue
             last_blank = True
-        else:
-            last_blank = False
-            if normalized in seen:
-                changed = True
-                continue
-            seen.add(normalized)
-
+            deduped.append("")
+            continue
+
+        last_blank = False
+        if normalized in seen:
+            changed = True
+            continue
+        seen[normalized] = None
         deduped.append(line.rstrip())
 
-    result = "\n".join(deduped).strip()
-    return result if changed else text.strip()
+    if not changed:
+        return text.strip()
+    return "\n".join(deduped).strip()
 
 
 def _sanitize_messages(messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
     """Return a copy of messages with duplicate lines removed across all content blocks."""
 
     sanitized: List[Dict[str, str]] = []
-    seen: set = set()
+    seen: Dict[str, None] = {}
 
     for message in messages:
         content = message.get("content")
@@ -89,6 +92,34 @@ def get_openai_client() -> OpenAI:
     return client
 
 
+def _walk_output_content(response: Any) -> str:
+    """Pull the first JSON or text block out of ``response.output``."""
+
+    for output in getattr(response, "output", []):
+        for content in getattr(output, "content", []):
+            if getattr(content, "json", None) is not None:
+                return json.dumps(content.json)
+            if getattr(content, "text", None) is not None:
+                return content.text
+    raise RuntimeError("OpenAI response did not contain text or JSON content")
+
+
+def _resolve_text_extractor() -> Callable[[Any], str]:
+    """Pick the response text accessor once for the installed SDK version."""
+
+    try:
+        from openai.types.responses import Response
+    except ImportError:  # pragma: no cover - pre-Responses SDKs
+        return _walk_output_content
+
+    if isinstance(getattr(Response, "output_text", None), property):
+        return operator.attrgetter("output_text")
+    return _walk_output_content
+
+
+_extract_text: Callable[[Any], str] = _resolve_text_extractor()
+
+
 def call_openai_json(
     client: OpenAI, messages: List[Dict[str, str]], model_name: str = DEFAULT_MODEL_NAME
 ) -> str:
@@ -101,19 +132,9 @@ def call_openai_json(
     except Exception as exc:
         raise RuntimeError(f"OpenAI request failed: {exc}") from exc
 
-    # Prefer explicit text accessor when available
-    if hasattr(response, "output_text") and response.output_text is not None:
-        return response.output_text
-
-    # Walk the output content to support different SDK structures
     try:
-        for output in getattr(response, "output", []):
-            for content in getattr(output, "content", []):
-                if getattr(content, "json", None) is not None:
-                    return json.dumps(content.json)
-                if getattr(content, "text", None) is not None:
-                    return content.text
+        return _extract_text(response)
+    except RuntimeError:
+        raise
     except Exception as exc:
         raise RuntimeError(f"Unexpected response format from OpenAI: {exc}") from exc
-
-    raise RuntimeError("OpenAI response did not contain text or JSON content")
@@ -3,9 +3,16 @@ from __future__ import annotations
 
 import json
 import re
-from typing import Dict, List, Optional, Sequence, Tuple
+import string
+from collections import ChainMap
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from rule_storage import RuleChunk
+try:  # pragma: no cover - optional dependency for performance
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+from rule_storage import QueryResult, RetrievedRule, RuleChunk
 
 PAGE_LENGTH_HINTS = {
     "home": "Home pages should read like a full landing page: aim for 1,300–1,700 words across 8–12 sections with full paragraphs, not stubs.",
@@ -42,26 +49,32 @@ def _format_rule_block(static_rules: Dict[str, Sequence[str]]) -> str:
     return "\n\n".join(sections)
 
 
-def _format_dynamic_rules(chunks: Sequence[RuleChunk]) -> str:
+def _unwrap_rule(rule: RetrievedRule) -> Tuple[RuleChunk, Optional[float]]:
+    if isinstance(rule, QueryResult):
+        return rule.chunk, rule.score
+    return rule, rule.metadata.get("score")
+
+
+def _format_dynamic_rules(chunks: Sequence[RetrievedRule]) -> str:
     if not chunks:
         return "No dynamic golden rule snippets retrieved; rely on static core rules."
 
     seen_texts = set()
-    unique_chunks: List[RuleChunk] = []
-    for chunk in chunks:
+    unique_chunks: List[Tuple[RuleChunk, Optional[float]]] = []
+    for rule in chunks:
+        chunk, score = _unwrap_rule(rule)
         normalized = chunk.text.strip()
         if not normalized or normalized.lower() in seen_texts:
             continue
         seen_texts.add(normalized.lower())
-        unique_chunks.append(chunk)
+        unique_chunks.append((chunk, score))
 
     if not unique_chunks:
         return "No dynamic golden rule snippets retrieved; rely on static core rules."
 
     lines = []
-    for idx, chunk in enumerate(unique_chunks, start=1):
+    for idx, (chunk, score) in enumerate(unique_chunks, start=1):
         tags = ", ".join(chunk.metadata.get("tags", []))
-        score = chunk.metadata.get("score")
         score_txt = f" (sim={score:.3f})" if isinstance(score, float) else ""
         lines.append(f"[{idx}] (tags: {tags}){score_txt}\n{chunk.text.strip()}")
     return "\n\n".join(lines)
@@ -76,11 +89,12 @@ def analyze_homepage_copy(home_page_copy: str) -> Dict[str, str]:
     if not sentences:
         return {}
 
-    avg_sentence_len = sum(len(s.split()) for s in sentences) / max(len(sentences), 1)
-    short_sentence_ratio = sum(1 for s in sentences if len(s.split()) <= 12) / len(sentences)
+    word_counts = [len(s.split()) for s in sentences]
+    avg_sentence_len = sum(word_counts) / len(word_counts)
+    short_sentence_ratio = sum(1 for count in word_counts if count <= 12) / len(word_counts)
 
     cta_count = len(re.findall(r"call|schedule|book|contact|request|learn more|get started", home_page_copy, re.I))
-    headline_like = len([s for s in sentences if len(s.split()) <= 8])
+    headline_like = sum(1 for count in word_counts if count <= 8)
 
     tone_flags = []
     if re.search(r"we\b|our team|our clinic", home_page_copy, re.I):
@@ -113,95 +127,129 @@ def build_query_text(
     return " | ".join(p for p in parts if p)
 
 
-def build_hybrid_prompt(
-    static_rules: Dict[str, Sequence[str]],
-    dynamic_rules: Sequence[RuleChunk],
-    brand_info: Dict[str, str],
-    page_info: Dict[str, str],
-    keywords: Dict[str, List[str]],
-    onboarding_notes: str,
-    brand_book: str,
-    home_page_copy: str,
-    home_page_profile: Dict[str, str],
-) -> Tuple[str, str]:
-    """Construct the unified prompt string plus diagnostics."""
-
-    static_block = _format_rule_block(static_rules)
-    dynamic_block = _format_dynamic_rules(dynamic_rules)
-    length_hint = PAGE_LENGTH_HINTS.get(
-        page_info.get("page_type", ""),
-        "Aim for 1,000–1,300 words with complete sections that would fit a production-ready web page.",
-    )
-    keyword_block = "\n".join(
-        [
-            f"Paramount keywords: {', '.join(keywords.get('paramount', [])) or 'None'}",
-            f"Primary keywords: {', '.join(keywords.get('primary', [])) or 'None'}",
-            f"Page SEO keywords: {', '.join(keywords.get('page_primary', [])) or 'None'}",
-            f"Supporting keywords: {', '.join(keywords.get('page_supporting', [])) or 'None'}",
-        ]
-    )
-
-    home_profile_lines = (
-        "\n".join(f"- {k}: {v}" for k, v in home_page_profile.items()) if home_page_profile else "None provided"
-    )
-
-    prompt = f"""
+_PROMPT_TEMPLATE = string.Template(
+    """
 You are a medical website copy specialist. Follow the static core rules FIRST, then the retrieved dynamic golden rule snippets, without contradicting either.
 
 STATIC CORE RULES (always apply):
-{static_block}
+$static_block
 
 DYNAMIC GOLDEN RULE SNIPPETS (semantic retrieval):
-{dynamic_block}
+$dynamic_block
 
 BRAND + CONTEXT:
-- Brand: {brand_info.get('name', '')}
-- Industry/Niche: {brand_info.get('industry', '')}
-- Location: {brand_info.get('location', '')}
-- Voice & tone: {brand_info.get('voice_tone', '')}
-- Target audience: {brand_info.get('target_audience', '')}
-- UVP: {brand_info.get('uvp', '')}
-- Notes: {brand_info.get('notes', '')}
+- Brand: $name
+- Industry/Niche: $industry
+- Location: $location
+- Voice & tone: $voice_tone
+- Target audience: $target_audience
+- UVP: $uvp
+- Notes: $notes
 
 PAGE REQUEST:
-- Page type: {page_info.get('page_type', '')}
-- Page name: {page_info.get('page_name', '')}
-- Page topic: {page_info.get('topic', '')}
-- Service focus: {page_info.get('service', 'None specified')}
-- Audience intent: {page_info.get('intent', '')}
-- Goal: {page_info.get('goal', '')}
+- Page type: $page_type
+- Page name: $page_name
+- Page topic: $topic
+- Service focus: $service
+- Audience intent: $intent
+- Goal: $goal
 
 KEYWORDS & SEO:
-{keyword_block}
+Paramount keywords: $paramount_kw
+Primary keywords: $primary_kw
+Page SEO keywords: $page_primary_kw
+Supporting keywords: $page_supporting_kw
 
 BRAND BOOK / PERSONA HIGHLIGHTS:
-{brand_book or 'None provided'}
+$brand_book
 
 ONBOARDING INSIGHTS:
-{onboarding_notes or 'None provided'}
+$onboarding_notes
 
 HOMEPAGE STYLE PROFILE (mimic structure, tone, CTA pacing when provided):
-{home_profile_lines}
+$home_profile_lines
 
 HOMEPAGE REFERENCE COPY:
-{home_page_copy or 'None'}
+$home_page_copy
 
 OUTPUT INSTRUCTIONS:
 - Ensure the target audience stays consistent (do not shift between clinician and patient voices).
 - Use paramount and primary keywords naturally; avoid stuffing.
 - Respect SEO/AEO guidance, CTA style, and structure cues from the retrieved rules.
-- Length guardrail: {length_hint}
+- Length guardrail: $length_hint
 - Write concise, empathetic, medically accurate copy.
 - Return ONLY the JSON following the provided schema.
-"""
-
-    diagnostics = json.dumps(
-        {
-            "static_rules": list(static_rules.keys()),
-            "dynamic_rules": [chunk.metadata for chunk in dynamic_rules],
-            "home_page_profile": home_page_profile,
-        },
-        indent=2,
+""".strip()
+)
+
+_BRAND_DEFAULTS = {
+    "name": "",
+    "industry": "",
+    "location": "",
+    "voice_tone": "",
+    "target_audience": "",
+    "uvp": "",
+    "notes": "",
+}
+
+_PAGE_DEFAULTS = {
+    "page_type": "",
+    "page_name": "",
+    "topic": "",
+    "service": "None specified",
+    "intent": "",
+    "goal": "",
+}
+
+_DEFAULT_LENGTH_HINT = "Aim for 1,000–1,300 words with complete sections that would fit a production-ready web page."
+
+
+def _join_keywords(values: Sequence[str]) -> str:
+    return ", ".join(values) or "None"
+
+
+def build_hybrid_prompt(
+    static_rules: Dict[str, Sequence[str]],
+    dynamic_rules: Sequence[RetrievedRule],
+    brand_info: Dict[str, str],
+    page_info: Dict[str, str],
+    keywords: Dict[str, List[str]],
+    onboarding_notes: str,
+    brand_book: str,
+    home_page_copy: str,
+    home_page_profile: Dict[str, str],
+) -> Tuple[str, str]:
+    """Construct the unified prompt string plus diagnostics."""
+
+    brand = ChainMap(brand_info, _BRAND_DEFAULTS)
+    page = ChainMap(page_info, _PAGE_DEFAULTS)
+    mapping: Dict[str, Any] = {key: brand[key] for key in _BRAND_DEFAULTS}
+    mapping.update((key, page[key]) for key in _PAGE_DEFAULTS)
+    mapping.update(
+        static_block=_format_rule_block(static_rules),
+        dynamic_block=_format_dynamic_rules(dynamic_rules),
+        paramount_kw=_join_keywords(keywords.get("paramount", [])),
+        primary_kw=_join_keywords(keywords.get("primary", [])),
+        page_primary_kw=_join_keywords(keywords.get("page_primary", [])),
+        page_supporting_kw=_join_keywords(keywords.get("page_supporting", [])),
+        brand_book=brand_book or "None provided",
+        onboarding_notes=onboarding_notes or "None provided",
+        home_profile_lines=(
+            "\n".join(f"- {k}: {v}" for k, v in home_page_profile.items()) if home_page_profile else "None provided"
+        ),
+        home_page_copy=home_page_copy or "None",
+        length_hint=PAGE_LENGTH_HINTS.get(page["page_type"], _DEFAULT_LENGTH_HINT),
     )
+    prompt = _PROMPT_TEMPLATE.substitute(mapping)
+
+    diagnostics_payload = {
+        "static_rules": list(static_rules.keys()),
+        "dynamic_rules": [chunk.metadata for chunk in dynamic_rules],
+        "home_page_profile": home_page_profile,
+    }
+    if orjson is not None:
+        diagnostics = orjson.dumps(diagnostics_payload, option=orjson.OPT_INDENT_2).decode("utf-8")
+    else:
+        diagnostics = json.dumps(diagnostics_payload, indent=2)
 
-    return prompt.strip(), diagnostics
+    return prompt, diagnostics
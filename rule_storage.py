@@ -4,8 +4,11 @@ from __future__ import annotations
 import json
 import os
 import re
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Sequence
+from typing import Any, Callable, Deque, Dict, Iterator, List, NamedTuple, Optional, Sequence, Union
 
 import numpy as np
 from openai import OpenAI
@@ -15,34 +18,93 @@ try:  # pragma: no cover - optional dependency for performance
 except ImportError:  # pragma: no cover
     faiss = None
 
+try:  # pragma: no cover - optional dependency for performance
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
 DEFAULT_EMBEDDING_MODEL = "text-embedding-3-small"
+# Inputs per embeddings request; well under the API's 2048-item cap so each
+# request stays small even for large rule documents.
+EMBEDDING_BATCH_SIZE = 96
+EMBEDDING_CONCURRENCY = 4
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RuleChunk:
     """Represents a rule snippet with metadata for retrieval."""
 
     text: str
-    embedding: List[float]
+    embedding: Sequence[float]
     metadata: Dict[str, Any] = field(default_factory=dict)
 
-    def to_dict(self) -> Dict[str, Any]:
+    def to_dict(self, embedding_index: Optional[int] = None) -> Dict[str, Any]:
+        if embedding_index is not None:
+            return {"text": self.text, "embedding_index": embedding_index, "metadata": self.metadata}
         return {"text": self.text, "embedding": self.embedding, "metadata": self.metadata}
 
     @classmethod
-    def from_dict(cls, payload: Dict[str, Any]) -> "RuleChunk":
+    def from_dict(cls, payload: Dict[str, Any], vectors: Optional[np.ndarray] = None) -> "RuleChunk":
+        embedding_index = payload.get("embedding_index")
+        if embedding_index is not None and vectors is not None:
+            embedding = vectors[embedding_index]
+        else:
+            embedding = payload.get("embedding", [])
         return cls(
             text=payload.get("text", ""),
-            embedding=payload.get("embedding", []),
+            embedding=embedding,
             metadata=payload.get("metadata", {}),
         )
 
 
-def _embed_texts(client: OpenAI, texts: Sequence[str], model: str = DEFAULT_EMBEDDING_MODEL) -> List[List[float]]:
+class QueryResult(NamedTuple):
+    """A retrieved chunk paired with its similarity score; the chunk itself is shared, not copied."""
+
+    chunk: RuleChunk
+    score: float
+
+    @property
+    def text(self) -> str:
+        return self.chunk.text
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return {**self.chunk.metadata, "score": self.score}
+
+
+RetrievedRule = Union[RuleChunk, QueryResult]
+
+
+def _embed_texts(
+    client: OpenAI,
+    texts: Sequence[str],
+    model: str = DEFAULT_EMBEDDING_MODEL,
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    max_workers: int = EMBEDDING_CONCURRENCY,
+) -> List[List[float]]:
     if not texts:
         return []
-    response = client.embeddings.create(model=model, input=list(texts))
-    return [item.embedding for item in response.data]
+    texts = list(texts)
+    batches = [texts[i : i + batch_size] for i in range(0, len(texts), batch_size)]
+
+    def _embed_batch(batch: List[str]) -> List[List[float]]:
+        response = client.embeddings.create(model=model, input=batch)
+        return [item.embedding for item in response.data]
+
+    if len(batches) == 1:
+        return _embed_batch(batches[0])
+
+    # The sync client is thread-safe; map() keeps results in batch order.
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as pool:
+        return [embedding for batch in pool.map(_embed_batch, batches) for embedding in batch]
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Scale each row to unit length so inner product equals cosine similarity."""
+
+    if vectors.ndim != 2 or vectors.size == 0:
+        return vectors
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True).clip(min=1e-12)
 
 
 def _guess_tags_from_text(text: str) -> List[str]:
@@ -61,33 +123,51 @@ def _guess_tags_from_text(text: str) -> List[str]:
     return sorted(tags)
 
 
+def _iter_chunks(text: str, size: int, overlap: int) -> Iterator[str]:
+    """Yield overlapping word windows from ``text`` without materializing every word."""
+
+    step = size - overlap if overlap < size else size
+    window: Deque[str] = deque(maxlen=size)
+    pending = 0
+    for match in re.finditer(r"\S+", text):
+        window.append(match.group())
+        pending += 1
+        if len(window) == size:
+            yield " ".join(window)
+            pending = 0
+            for _ in range(step):
+                window.popleft()
+    if pending:
+        yield " ".join(window)
+
+
 def chunk_golden_rules(text: str, chunk_size_words: int = 260, overlap_words: int = 40) -> List[str]:
     """Chunk the golden rule framework into overlapping segments for retrieval."""
 
-    cleaned = re.sub(r"\s+", " ", text).strip()
-    if not cleaned:
+    if chunk_size_words <= 0:
         return []
-
-    words = cleaned.split(" ")
-    chunks: List[str] = []
-    start = 0
-    while start < len(words):
-        end = min(len(words), start + chunk_size_words)
-        chunk_words = words[start:end]
-        chunk = " ".join(chunk_words).strip()
-        if chunk:
-            chunks.append(chunk)
-        if end == len(words):
-            break
-        start = max(end - overlap_words, end) if overlap_words >= chunk_size_words else end - overlap_words
     # De-duplicate minor overlaps if any
-    unique_chunks: List[str] = []
-    seen = set()
-    for chunk in chunks:
-        if chunk not in seen:
-            unique_chunks.append(chunk)
-            seen.add(chunk)
-    return unique_chunks
+    return list(dict.fromkeys(_iter_chunks(text, chunk_size_words, max(overlap_words, 0))))
+
+
+def _write_atomically(path: str, write: Callable[[Any], None]) -> None:
+    """Write ``path`` via a sibling temp file and ``os.replace``.
+
+    Loaded stores memory-map their .npy/.faiss files; replacing rather than
+    truncating keeps those mappings (and other sessions') on the old inode
+    instead of corrupting the file they are reading from.
+    """
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path) or ".", prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
 
 
 class RuleStore:
@@ -112,11 +192,10 @@ class RuleStore:
             return []
 
         embeddings = _embed_texts(client, chunk_texts, model=self.embedding_model)
-        vectors = np.array(embeddings).astype("float32")
+        vectors = _normalize_rows(np.array(embeddings).astype("float32"))
         self._vectors = vectors
         if faiss is not None:
             index = faiss.IndexFlatIP(vectors.shape[1])
-            faiss.normalize_L2(vectors)
             index.add(vectors)
             self.index = index
         else:
@@ -133,7 +212,7 @@ class RuleStore:
         query: str,
         top_k: int = 5,
         required_tags: Optional[List[str]] = None,
-    ) -> List[RuleChunk]:
+    ) -> List[QueryResult]:
         if not self.is_ready:
             return []
 
@@ -148,16 +227,18 @@ class RuleStore:
             scores, indices = self.index.search(query_np, top_k)
             scored = list(zip(scores[0], indices[0]))
         else:
-            vectors = self._vectors or np.array([chunk.embedding for chunk in self.chunks]).astype("float32")
+            if self._vectors is None:
+                self._vectors = _normalize_rows(np.array([chunk.embedding for chunk in self.chunks]).astype("float32"))
+            vectors = self._vectors
             if vectors.size == 0:
                 return []
             query_np = np.array(query_vec).astype("float32")
-            # cosine similarity
-            norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query_np)
-            scores_raw = vectors @ query_np / np.maximum(norms, 1e-12)
-            scored = sorted([(score, idx) for idx, score in enumerate(scores_raw)], key=lambda x: x[0], reverse=True)[:top_k]
+            # stored rows are unit length, so cosine similarity only needs the query norm
+            scores_raw = vectors @ (query_np / max(float(np.linalg.norm(query_np)), 1e-12))
+            top = np.argsort(-scores_raw, kind="stable")[:top_k]
+            scored = zip(scores_raw[top], top)
 
-        top_chunks: List[RuleChunk] = []
+        results: List[QueryResult] = []
         for score, idx in scored:
             if idx == -1 or idx >= len(self.chunks):
                 continue
@@ -166,37 +247,54 @@ class RuleStore:
                 chunk_tags = chunk.metadata.get("tags", [])
                 if not any(tag in chunk_tags for tag in required_tags):
                     continue
-            chunk_copy = RuleChunk(
-                text=chunk.text,
-                embedding=chunk.embedding,
-                metadata={**chunk.metadata, "score": float(score)},
-            )
-            top_chunks.append(chunk_copy)
-        return top_chunks
+            results.append(QueryResult(chunk, float(score)))
+        return results
 
     def save(self, path_prefix: str) -> None:
         if not self.is_ready:
             return
         os.makedirs(os.path.dirname(path_prefix), exist_ok=True)
         if self.index is not None and faiss is not None:
-            faiss.write_index(self.index, f"{path_prefix}.faiss")
-        with open(f"{path_prefix}.json", "w", encoding="utf-8") as f:
-            json.dump([chunk.to_dict() for chunk in self.chunks], f)
+            index = self.index
+            _write_atomically(
+                f"{path_prefix}.faiss",
+                lambda f: f.write(faiss.serialize_index(index).tobytes()),
+            )
+        vectors = self._vectors
+        if vectors is None:
+            vectors = _normalize_rows(np.array([chunk.embedding for chunk in self.chunks]).astype("float32"))
+        array = np.ascontiguousarray(vectors, dtype=np.float32)
+        _write_atomically(f"{path_prefix}.npy", lambda f: np.save(f, array))
+        payload = [chunk.to_dict(embedding_index=idx) for idx, chunk in enumerate(self.chunks)]
+        if orjson is not None:
+            data = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+        else:
+            data = json.dumps(payload).encode("utf-8")
+        _write_atomically(f"{path_prefix}.json", lambda f: f.write(data))
 
     @classmethod
     def load(cls, path_prefix: str) -> "RuleStore":
         store = cls()
         faiss_path = f"{path_prefix}.faiss"
         meta_path = f"{path_prefix}.json"
+        vectors_path = f"{path_prefix}.npy"
         if not os.path.exists(meta_path):
             return store
         try:
             if faiss is not None and os.path.exists(faiss_path):
-                store.index = faiss.read_index(faiss_path)
-            with open(meta_path, "r", encoding="utf-8") as f:
-                payload = json.load(f)
-            store.chunks = [RuleChunk.from_dict(item) for item in payload]
-            store._vectors = np.array([chunk.embedding for chunk in store.chunks]).astype("float32")
+                store.index = faiss.read_index(faiss_path, faiss.IO_FLAG_MMAP_IFC)
+            if orjson is not None:
+                with open(meta_path, "rb") as f:
+                    payload = orjson.loads(f.read())
+            else:
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    payload = json.load(f)
+            vectors = np.load(vectors_path, mmap_mode="r") if os.path.exists(vectors_path) else None
+            store.chunks = [RuleChunk.from_dict(item, vectors) for item in payload]
+            if vectors is None:
+                # Stores saved before embeddings moved to .npy keep them inline.
+                vectors = _normalize_rows(np.array([chunk.embedding for chunk in store.chunks]).astype("float32"))
+            store._vectors = vectors
         except Exception:
             store.index = None
             store.chunks = []
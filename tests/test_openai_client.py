@@ -2,12 +2,18 @@
 
 import sys
 from pathlib import Path
+from types import SimpleNamespace
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.append(str(ROOT))
 
-from openai_client import _dedupe_prompt_lines, _sanitize_messages
+from openai_client import (
+    _dedupe_prompt_lines,
+    _sanitize_messages,
+    _walk_output_content,
+    call_openai_json,
+)
 
 
 def test_dedupe_prompt_lines_removes_duplicate_non_empty_lines():
@@ -49,3 +55,18 @@ def test_sanitize_messages_dedupes_across_messages():
 
     assert sanitized[0]["content"] == "Instruction A\nInstruction B"
     assert sanitized[1]["content"] == "Instruction C"
+
+
+def test_call_openai_json_returns_output_text():
+    response = SimpleNamespace(output_text='{"ok": true}')
+    client = SimpleNamespace(responses=SimpleNamespace(create=lambda **_: response))
+
+    assert call_openai_json(client, [{"role": "user", "content": "Hi"}]) == '{"ok": true}'
+
+
+def test_walk_output_content_prefers_json_blocks():
+    response = SimpleNamespace(
+        output=[SimpleNamespace(content=[SimpleNamespace(json={"a": 1}, text=None)])]
+    )
+
+    assert _walk_output_content(response) == '{"a": 1}'
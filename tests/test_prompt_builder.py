@@ -7,8 +7,8 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.append(str(ROOT))
 
-from prompt_builder import _format_dynamic_rules, _format_rule_block
-from rule_storage import RuleChunk
+from prompt_builder import PAGE_LENGTH_HINTS, _format_dynamic_rules, _format_rule_block, build_hybrid_prompt
+from rule_storage import QueryResult, RuleChunk
 
 
 def test_format_rule_block_dedupes_and_ignores_blanks():
@@ -46,3 +46,32 @@ def test_format_dynamic_rules_returns_fallback_when_empty_after_dedupe():
         == "No dynamic golden rule snippets retrieved; rely on static core rules."
     )
 
+
+
+def test_format_dynamic_rules_accepts_query_results():
+    chunk = RuleChunk(text="Lead with outcomes", embedding=[], metadata={"tags": ["cta"]})
+
+    formatted = _format_dynamic_rules([QueryResult(chunk, 0.5)])
+
+    assert "(tags: cta) (sim=0.500)" in formatted
+    assert "score" not in chunk.metadata
+
+
+def test_build_hybrid_prompt_fills_defaults_and_keeps_literal_dollars():
+    prompt, _ = build_hybrid_prompt(
+        static_rules={},
+        dynamic_rules=[],
+        brand_info={"name": "Clinic $1"},
+        page_info={"page_type": "home"},
+        keywords={"paramount": ["botox", "fillers"]},
+        onboarding_notes="",
+        brand_book="",
+        home_page_copy="",
+        home_page_profile={},
+    )
+
+    assert "- Brand: Clinic $1" in prompt
+    assert "- Service focus: None specified" in prompt
+    assert "Paramount keywords: botox, fillers" in prompt
+    assert "Primary keywords: None" in prompt
+    assert PAGE_LENGTH_HINTS["home"] in prompt
@@ -0,0 +1,166 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from rule_storage import RuleChunk, RuleStore, _embed_texts, chunk_golden_rules
+
+
+def test_chunk_golden_rules_overlaps_windows() -> None:
+    text = " ".join(f"w{i}" for i in range(10))
+
+    chunks = chunk_golden_rules(text, chunk_size_words=4, overlap_words=1)
+
+    assert chunks == ["w0 w1 w2 w3", "w3 w4 w5 w6", "w6 w7 w8 w9"]
+
+
+def test_chunk_golden_rules_collapses_whitespace_and_handles_tail() -> None:
+    text = "alpha\n\nbeta   gamma\tdelta epsilon"
+
+    chunks = chunk_golden_rules(text, chunk_size_words=3, overlap_words=0)
+
+    assert chunks == ["alpha beta gamma", "delta epsilon"]
+
+
+def test_chunk_golden_rules_progresses_when_overlap_exceeds_size() -> None:
+    text = " ".join(f"w{i}" for i in range(6))
+
+    chunks = chunk_golden_rules(text, chunk_size_words=2, overlap_words=5)
+
+    assert chunks == ["w0 w1", "w2 w3", "w4 w5"]
+
+
+def test_chunk_golden_rules_empty_text() -> None:
+    assert chunk_golden_rules("   \n ") == []
+
+
+class _FakeEmbeddings:
+    def __init__(self, vectors):
+        self._vectors = vectors
+
+    def create(self, model, input):
+        return SimpleNamespace(data=[SimpleNamespace(embedding=self._vectors[text]) for text in input])
+
+
+def test_rule_store_query_returns_shared_chunks_with_scores() -> None:
+    vectors = {
+        "alpha": [1.0, 0.0],
+        "beta": [0.0, 1.0],
+        "query": [0.9, 0.1],
+    }
+    client = SimpleNamespace(embeddings=_FakeEmbeddings(vectors))
+    store = RuleStore()
+    store.chunks = [
+        RuleChunk(text="alpha", embedding=vectors["alpha"], metadata={"tags": ["seo"]}),
+        RuleChunk(text="beta", embedding=vectors["beta"], metadata={"tags": ["tone"]}),
+    ]
+
+    results = store.query(client, "query", top_k=2)
+
+    assert [result.text for result in results] == ["alpha", "beta"]
+    assert results[0].chunk is store.chunks[0]
+    assert results[0].score > results[1].score
+    assert "score" not in store.chunks[0].metadata
+
+
+def test_embed_texts_batches_requests_and_preserves_order() -> None:
+    calls = []
+
+    class _RecordingEmbeddings:
+        def create(self, model, input):
+            calls.append(list(input))
+            return SimpleNamespace(data=[SimpleNamespace(embedding=[float(text)]) for text in input])
+
+    client = SimpleNamespace(embeddings=_RecordingEmbeddings())
+    texts = [str(i) for i in range(7)]
+
+    embeddings = _embed_texts(client, texts, batch_size=3)
+
+    assert embeddings == [[float(i)] for i in range(7)]
+    assert sorted(len(batch) for batch in calls) == [1, 3, 3]
+
+
+def test_rule_store_save_and_load_round_trip(tmp_path) -> None:
+    store = RuleStore()
+    store.chunks = [
+        RuleChunk(text="alpha", embedding=[1.0, 0.0], metadata={"tags": ["seo"]}),
+        RuleChunk(text="beta", embedding=[0.0, 1.0], metadata={"tags": ["tone"]}),
+    ]
+    prefix = str(tmp_path / "rules" / "index")
+
+    store.save(prefix)
+    loaded = RuleStore.load(prefix)
+
+    assert [chunk.text for chunk in loaded.chunks] == ["alpha", "beta"]
+    assert loaded.chunks[1].metadata == {"tags": ["tone"]}
+    assert loaded._vectors.tolist() == [[1.0, 0.0], [0.0, 1.0]]
+    assert isinstance(loaded._vectors, np.memmap)
+    assert '"embedding"' not in (tmp_path / "rules" / "index.json").read_text(encoding="utf-8")
+
+
+def test_rule_store_save_over_loaded_store_keeps_files_intact(tmp_path) -> None:
+    vectors = {"Keep headings short.": [3.0, 4.0], "query": [3.0, 4.0]}
+    client = SimpleNamespace(embeddings=_FakeEmbeddings(vectors))
+    store = RuleStore()
+    store.build(client, "Keep headings short.")
+    prefix = str(tmp_path / "index")
+    store.save(prefix)
+
+    loaded = RuleStore.load(prefix)
+    loaded.save(prefix)
+    reloaded = RuleStore.load(prefix)
+
+    assert [chunk.text for chunk in reloaded.chunks] == ["Keep headings short."]
+    assert np.allclose(loaded._vectors, [[0.6, 0.8]])
+    assert np.allclose(reloaded._vectors, [[0.6, 0.8]])
+    assert (reloaded.index is None) == (store.index is None)
+    results = reloaded.query(client, "query", top_k=1)
+    assert results[0].score == pytest.approx(1.0, abs=1e-6)
+    assert not [path.name for path in tmp_path.iterdir() if path.name.endswith(".tmp")]
+
+
+def test_rule_store_query_uses_loaded_vectors_without_index(tmp_path) -> None:
+    vectors = {"alpha": [1.0, 0.0], "beta": [0.0, 1.0], "query": [0.1, 0.9]}
+    store = RuleStore()
+    store.chunks = [
+        RuleChunk(text="alpha", embedding=vectors["alpha"], metadata={"tags": ["seo"]}),
+        RuleChunk(text="beta", embedding=vectors["beta"], metadata={"tags": ["tone"]}),
+    ]
+    prefix = str(tmp_path / "index")
+    store.save(prefix)
+    loaded = RuleStore.load(prefix)
+
+    results = loaded.query(SimpleNamespace(embeddings=_FakeEmbeddings(vectors)), "query", top_k=1)
+
+    assert [result.text for result in results] == ["beta"]
+
+
+def test_rule_store_load_reads_legacy_inline_embeddings(tmp_path) -> None:
+    prefix = tmp_path / "index"
+    (tmp_path / "index.json").write_text(
+        '[{"text": "alpha", "embedding": [1.0, 0.0], "metadata": {"tags": ["seo"]}}]',
+        encoding="utf-8",
+    )
+
+    loaded = RuleStore.load(str(prefix))
+
+    assert loaded.chunks[0].embedding == [1.0, 0.0]
+    assert loaded._vectors.tolist() == [[1.0, 0.0]]
+
+
+def test_rule_store_build_stores_unit_length_vectors() -> None:
+    vectors = {"Keep headings short.": [3.0, 4.0], "query": [3.0, 4.0]}
+    client = SimpleNamespace(embeddings=_FakeEmbeddings(vectors))
+    store = RuleStore()
+
+    store.build(client, "Keep headings short.")
+    results = store.query(client, "query", top_k=1)
+
+    assert np.allclose(np.linalg.norm(store._vectors, axis=1), 1.0)
+    assert results[0].score == pytest.approx(1.0, abs=1e-6)
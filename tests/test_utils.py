@@ -1,5 +1,10 @@
+import dataclasses
+import io
+import json
+import subprocess
 import sys
 from pathlib import Path
+from types import SimpleNamespace
 
 import pytest
 
@@ -7,7 +12,21 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.append(str(ROOT))
 
-from utils import SchemaValidationError, safe_json_loads, validate_against_schema
+import utils
+from config import PAGE_TYPE_SCHEMAS
+from utils import (
+    PageDefinition,
+    SEOEntry,
+    SchemaValidationError,
+    build_site_export,
+    export_bytes,
+    get_page_schema,
+    get_page_validator,
+    parse_seo_csv,
+    parse_sitemap_csv,
+    safe_json_loads,
+    validate_against_schema,
+)
 
 
 def test_safe_json_loads_extracts_first_object_when_wrapped() -> None:
@@ -16,6 +35,16 @@ def test_safe_json_loads_extracts_first_object_when_wrapped() -> None:
     assert parsed == {"hello": "world"}
 
 
+def test_safe_json_loads_stops_after_first_object() -> None:
+    assert safe_json_loads('{"a": 1} and later {"b": 2}') == {"a": 1}
+
+
+def test_safe_json_loads_memoizes_repeated_output() -> None:
+    raw = 'Here you go: {"outline": [{"section_id": "hero"}]}'
+
+    assert safe_json_loads(raw) is safe_json_loads(raw)
+
+
 def test_validate_against_schema_passes_for_matching_payload() -> None:
     schema = {"root": {"items": [{"name": "", "count": 0}]}}
     payload = {"root": {"items": [{"name": "Widget", "count": 3}]}}
@@ -30,3 +59,447 @@ def test_validate_against_schema_raises_on_missing_key() -> None:
     with pytest.raises(SchemaValidationError):
         validate_against_schema(schema, payload)
 
+
+def test_validate_against_schema_reports_first_error_in_schema_order() -> None:
+    schema = {"a": {"x": ""}, "b": ""}
+
+    with pytest.raises(SchemaValidationError, match=r"non-empty value at \$\.a\.x"):
+        validate_against_schema(schema, {"a": {"x": None}})
+
+
+def test_validate_against_schema_reports_list_item_path() -> None:
+    schema = {"steps": [{"title": ""}]}
+    payload = {"steps": [{"title": "One"}, {"title": "Two"}, {}]}
+
+    with pytest.raises(SchemaValidationError, match=r"Missing key 'title' at \$\.steps\[2\]"):
+        validate_against_schema(schema, payload)
+
+
+def test_get_page_validator_reports_nested_path() -> None:
+    validator = get_page_validator("about")
+    payload = {key: value for key, value in PAGE_TYPE_SCHEMAS["about"].items()}
+    payload["team_section"] = {**payload["team_section"], "members": [{"name": "Ann", "role": " ", "bio": "x"}]}
+
+    with pytest.raises(SchemaValidationError, match=r"\$\.team_section\.members\[0\]\.role"):
+        validator(payload)
+    with pytest.raises(KeyError):
+        get_page_validator("blog")
+
+
+def test_page_validator_reports_nested_type_mismatch() -> None:
+    valid = PAGE_TYPE_SCHEMAS["location"]
+    invalid = {**valid, "local_faqs": {"title": "FAQs", "items": "not a list"}}
+
+    get_page_validator("location")(valid)
+    with pytest.raises(SchemaValidationError, match=r"Expected list at \$\.local_faqs\.items, got str"):
+        get_page_validator("location")(invalid)
+
+
+
+def test_parse_seo_csv_builds_entries_and_skips_blank_slugs() -> None:
+    csv = io.BytesIO(
+        b"slug,primary_keyword,supporting_keywords\n"
+        b' home ,dentist," cleanings , whitening,"\n'
+        b"  ,orphan,ignored\n"
+        b"about,our team,bios\n"
+    )
+
+    seo_map, warnings = parse_seo_csv(csv)
+
+    assert warnings == []
+    assert list(seo_map) == ["home", "about"]
+    assert seo_map["home"].primary_keyword == "dentist"
+    assert seo_map["home"].supporting_keywords == ("cleanings", "whitening")
+
+
+def test_parse_seo_csv_reports_missing_columns() -> None:
+    seo_map, warnings = parse_seo_csv(io.BytesIO(b"slug,primary_keyword\nhome,dentist\n"))
+
+    assert seo_map == {}
+    assert warnings == ["SEO CSV is missing required columns: supporting_keywords"]
+
+
+def test_parse_seo_csv_splits_multi_word_and_single_char_keywords() -> None:
+    csv = io.BytesIO(b'slug,primary_keyword,supporting_keywords\nhome,dentist,"a,  root canal\t, ,x "\n')
+
+    seo_map, _ = parse_seo_csv(csv)
+
+    assert seo_map["home"].supporting_keywords == ("a", "root canal", "x")
+
+
+def test_parse_sitemap_csv_normalizes_page_types_and_flags_invalid() -> None:
+    csv = io.BytesIO(
+        b"slug,page_name,page_type\n"
+        b"home,Home, Home \n"
+        b"implants,Implants,Sub_Service\n"
+        b"blog,Blog,blog  post\n"
+    )
+
+    pages, warnings = parse_sitemap_csv(csv, ["home", "service", "sub service"])
+
+    assert [page_type for _, _, page_type in pages] == ["home", "sub service", "blog post"]
+    assert warnings == [
+        "Found unsupported page_type values in sitemap CSV: blog post. "
+        "Allowed: home, service, sub service."
+    ]
+
+
+def test_parse_sitemap_csv_strips_bom_and_reports_missing_columns() -> None:
+    pages, warnings = parse_sitemap_csv(io.BytesIO(b"\xef\xbb\xbfslug,page_name\nhome,Home\n"), ["home"])
+
+    assert pages == []
+    assert warnings == ["Sitemap CSV is missing required columns: page_type"]
+
+
+def test_parse_seo_csv_keeps_rows_missing_trailing_cells() -> None:
+    csv = io.BytesIO(b'slug,primary_keyword,supporting_keywords\n/a,kw\n/b,k2," x , y "\n/c\n')
+
+    seo_map, warnings = parse_seo_csv(csv)
+
+    assert warnings == []
+    assert list(seo_map) == ["/a", "/b", "/c"]
+    assert seo_map["/a"].primary_keyword == "kw"
+    assert seo_map["/a"].supporting_keywords == ()
+    assert seo_map["/b"].supporting_keywords == ("x", "y")
+    assert seo_map["/c"].primary_keyword is None
+
+
+def test_parse_seo_csv_treats_empty_cells_as_missing() -> None:
+    csv = io.BytesIO(b"slug,primary_keyword,supporting_keywords\n,orphan,x\nabout,,\n")
+
+    seo_map, _ = parse_seo_csv(csv)
+
+    assert list(seo_map) == ["about"]
+    assert seo_map["about"].primary_keyword is None
+    assert seo_map["about"].supporting_keywords == ()
+
+
+def test_parse_sitemap_csv_drops_rows_missing_slug_or_name() -> None:
+    csv = io.BytesIO(
+        b"slug,page_name,page_type,notes\n"
+        b"home,Home,home,keep\n"
+        b",Orphan,service,\n"
+        b"about,,about,\n"
+    )
+
+    pages, warnings = parse_sitemap_csv(csv, ["home", "service", "about"])
+
+    assert pages == [("home", "Home", "home")]
+    assert warnings == ["Removed 2 row(s) with empty slug or page_name."]
+
+
+def test_safe_json_loads_raises_stdlib_decode_error_on_garbage() -> None:
+    with pytest.raises(json.JSONDecodeError):
+        safe_json_loads("no json here")
+
+
+def test_safe_json_loads_falls_back_to_stdlib_decoder(monkeypatch) -> None:
+    monkeypatch.setattr(utils, "_json_loads", utils._json_decoder.decode)
+    utils._cached_json_loads.cache_clear()
+
+    assert safe_json_loads('Sure! {"a": [1, 2]} Done.') == {"a": [1, 2]}
+    with pytest.raises(json.JSONDecodeError):
+        safe_json_loads("still not json")
+
+
+def test_get_page_schema_returns_config_schema_and_rejects_unknown() -> None:
+    assert get_page_schema("home") is PAGE_TYPE_SCHEMAS["home"]
+
+    with pytest.raises(KeyError):
+        get_page_schema("blog")
+
+
+class _RecordingStreamlit:
+    def __init__(self) -> None:
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, *args))
+
+
+def test_render_page_preview_renders_page_type_schema(monkeypatch) -> None:
+    recorder = _RecordingStreamlit()
+    monkeypatch.setitem(sys.modules, "streamlit", recorder)
+    page_json = {
+        "hero": {"headline": "Whiter smiles", "subheadline": "Fast.", "primary_cta_label": "Book"},
+        "problem_section": {"title": "Problems", "intro": "Why now", "bullets": ["Stains", "Pain"]},
+        "faq_section": {"title": "FAQs", "items": [{"question": "Safe?", "answer": "Yes."}]},
+    }
+
+    utils.render_page_preview("service", page_json)
+
+    rendered = "\n".join(str(arg) for call in recorder.calls for arg in call[1:])
+    assert "Whiter smiles" in rendered
+    assert "### Problems" in rendered
+    assert "- Stains" in rendered and "- Pain" in rendered
+    assert "**Safe?** Yes." in rendered
+    assert ("info", "Preview unavailable: JSON does not match expected schema.") not in recorder.calls
+
+
+def test_schema_section_markdown_formats_steps_and_bullets() -> None:
+    section = {
+        "title": "Process",
+        "steps": [
+            {"step_number": 1, "title": "Consult", "description": "Talk."},
+            {"step_number": 2, "title": "Treat", "description": "Heal."},
+        ],
+        "bullets": ["One", "Two", "Three"],
+    }
+
+    markdown = utils._schema_section_markdown(section)
+
+    assert markdown.startswith("### Process\n\n- One\n- Two\n- Three")
+    assert "1. **Consult** — Talk.\n2. **Treat** — Heal." in markdown
+
+
+def test_schema_section_markdown_is_empty_without_known_keys() -> None:
+    assert utils._schema_section_markdown({"unexpected": "value"}) == ""
+    assert utils._schema_section_markdown({"title": "", "bullets": []}) == ""
+
+
+def test_build_site_export_keys_pages_by_slug() -> None:
+    results = [
+        {
+            "page": PageDefinition(slug="home", page_name="Home", page_type="home"),
+            "seo": SEOEntry(slug="home", primary_keyword="dentist", supporting_keywords_raw="smile"),
+            "final": {"hero": {}},
+        },
+        {"page": PageDefinition(slug="about", page_name="About", page_type="about"), "seo": None},
+    ]
+
+    export = build_site_export(results)
+
+    assert export["pages"]["home"]["seo"] == {"primary_keyword": "dentist", "supporting_keywords": ["smile"]}
+    assert export["pages"]["home"]["final_copy"] == {"hero": {}}
+    assert export["pages"]["about"] == {
+        "page_name": "About",
+        "page_type": "about",
+        "seo": {"primary_keyword": None, "supporting_keywords": []},
+        "final_copy": None,
+    }
+
+
+def test_export_bytes_round_trips_unicode() -> None:
+    payload = {"pages": {"home": {"final_copy": {"headline": "Café – smiles"}}}}
+
+    data = export_bytes(payload)
+
+    assert isinstance(data, bytes)
+    assert json.loads(data.decode("utf-8")) == payload
+
+
+@pytest.mark.parametrize("use_arrow", [True, False])
+def test_read_csv_string_columns_matches_with_and_without_pyarrow(monkeypatch, use_arrow) -> None:
+    if not use_arrow:
+        monkeypatch.setitem(sys.modules, "pyarrow.csv", None)
+    data = b'slug,primary_keyword,supporting_keywords\n home ,,"a, b"\n'
+
+    columns = utils._read_csv_string_columns(data, ["slug", "primary_keyword", "supporting_keywords"])
+    cleaned = utils._read_csv_string_columns(
+        b'supporting_keywords\n" a , ,b c,"\n", ,"\nsolo\n"x\xc2\xa0,y"\n',
+        ["supporting_keywords"],
+        keyword_columns=("supporting_keywords",),
+    )
+
+    assert columns == [["home"], [""], ["a, b"]]
+    assert cleaned == [["a,b c", "", "solo", "x,y"]]
+
+
+def test_parse_sitemap_csv_handles_all_blank_column() -> None:
+    csv = io.BytesIO(b"slug,page_name,page_type\nhome,Home,\nabout,About,\n")
+
+    pages, warnings = parse_sitemap_csv(csv, ["home"])
+
+    assert [page_type for _, _, page_type in pages] == ["", ""]
+
+
+def test_page_definition_is_frozen_and_hashable() -> None:
+    page = PageDefinition(slug="home", page_name="Home", page_type="home")
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        page.slug = "other"
+    assert {page: 1}[PageDefinition(slug="home", page_name="Home", page_type="home")] == 1
+
+
+def test_render_page_preview_renders_home_sections_list(monkeypatch) -> None:
+    recorder = _RecordingStreamlit()
+    monkeypatch.setitem(sys.modules, "streamlit", recorder)
+    page_json = {
+        "hero": {"headline": "Welcome"},
+        "sections": [{"id": "why_choose_us", "title": "Why us", "bullets": ["Care"]}],
+    }
+
+    utils.render_page_preview("home", page_json)
+
+    assert recorder.calls == [("markdown", "## Welcome\n\n### Why us\n\n- Care")]
+
+
+def test_render_page_preview_emits_medical_page_as_one_markdown(monkeypatch) -> None:
+    recorder = _RecordingStreamlit()
+    monkeypatch.setitem(sys.modules, "streamlit", recorder)
+    page_json = {
+        "page_type": "home",
+        "meta": {},
+        "hero": {"headline": "Care", "primary_cta": "Call"},
+        "sections": [{"id": "intro", "heading": "Intro", "body": "Hello.", "target_word_count": 150}],
+    }
+
+    utils.render_page_preview("home", page_json)
+
+    assert recorder.calls == [
+        (
+            "markdown",
+            "**Page type:** home\n\n## Care\n\n**CTA:** Call\n\n### Intro\n\nHello.\n\n_Target words: 150_",
+        )
+    ]
+
+
+def test_render_page_preview_reports_unrecognized_shape(monkeypatch) -> None:
+    recorder = _RecordingStreamlit()
+    monkeypatch.setitem(sys.modules, "streamlit", recorder)
+
+    utils.render_page_preview("service", {"title": "No hero"})
+
+    assert recorder.calls == [("info", "Preview unavailable: JSON does not match expected schema.")]
+
+
+@pytest.mark.parametrize("payload", [[{"a": 1}], "superhero text"])
+def test_render_page_preview_reports_non_object_json(monkeypatch, payload) -> None:
+    recorder = _RecordingStreamlit()
+    monkeypatch.setitem(sys.modules, "streamlit", recorder)
+
+    utils.render_page_preview("service", payload)
+
+    assert recorder.calls == [("info", "Preview unavailable: JSON does not match expected schema.")]
+
+
+def test_importing_utils_defers_heavy_dependencies() -> None:
+    code = (
+        "import sys, utils; "
+        "print(sorted(m for m in ('pandas', 'streamlit', 'docx', 'PyPDF2') if m in sys.modules))"
+    )
+
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.strip() == "[]"
+
+
+class _NamedUpload(io.BytesIO):
+    def __init__(self, data: bytes, name: str) -> None:
+        super().__init__(data)
+        self.name = name
+
+
+def test_load_text_from_upload_joins_docx_paragraphs() -> None:
+    from docx import Document
+
+    document = Document()
+    for text in ("Intro", "", "Details"):
+        document.add_paragraph(text)
+    buffer = io.BytesIO()
+    document.save(buffer)
+
+    text = utils.load_text_from_upload(_NamedUpload(buffer.getvalue(), "Brand.DOCX"))
+
+    assert text.endswith("Intro\n\nDetails")
+
+
+def test_extract_pdf_pages_pdfium_returns_one_entry_per_page() -> None:
+    pdfium = pytest.importorskip("pypdfium2")
+    document = pdfium.PdfDocument.new()
+    for _ in range(3):
+        document.new_page(72, 72)
+    buffer = io.BytesIO()
+    document.save(buffer)
+
+    assert utils._extract_pdf_pages_pdfium(pdfium, buffer.getvalue()) == ["", "", ""]
+
+
+def test_extract_pdf_pages_pdfium_holds_lock_for_whole_document() -> None:
+    seen = []
+
+    class _FakeDocument:
+        def __init__(self, data):
+            seen.append(("open", utils._PDFIUM_LOCK.locked()))
+
+        def __iter__(self):
+            seen.append(("pages", utils._PDFIUM_LOCK.locked()))
+            return iter(())
+
+        def close(self):
+            seen.append(("close", utils._PDFIUM_LOCK.locked()))
+
+    fake_pdfium = SimpleNamespace(PdfDocument=_FakeDocument)
+
+    assert utils._extract_pdf_pages_pdfium(fake_pdfium, b"%PDF") == []
+    assert seen == [("open", True), ("pages", True), ("close", True)]
+    assert not utils._PDFIUM_LOCK.locked()
+
+
+def test_extract_pdf_pages_pypdf2_returns_one_entry_per_page() -> None:
+    from PyPDF2 import PdfWriter
+
+    writer = PdfWriter()
+    for _ in range(3):
+        writer.add_blank_page(width=72, height=72)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+
+    assert utils._extract_pdf_pages_pypdf2(buffer.getvalue()) == ["", "", ""]
+
+
+def test_parse_keywords_dedupes_casefolded_keeping_first_spelling() -> None:
+    raw = "Dentist, teeth whitening\n  DENTIST ,Straße\nstrasse,,\n"
+
+    assert utils.parse_keywords(raw) == ["Dentist", "teeth whitening", "Straße"]
+    assert utils.parse_keywords("") == []
+
+
+def test_parse_sitemap_csv_reads_wide_exports_with_short_rows() -> None:
+    csv = io.BytesIO(
+        b"notes,page_type,extra,slug,page_name\r\n"
+        b"x,Service,y,implants,Implants\r\n"
+        b"\r\n"
+        b"z,home\r\n"
+    )
+
+    pages, warnings = parse_sitemap_csv(csv, ["service", "home"])
+
+    assert pages == [("implants", "Implants", "service")]
+    assert warnings == ["Removed 1 row(s) with empty slug or page_name."]
+
+
+def test_load_text_from_upload_reuses_extraction_for_same_bytes(monkeypatch) -> None:
+    calls = []
+    original = utils._extract_pdf_pages_pypdf2
+
+    def counting(pdf_bytes):
+        calls.append(pdf_bytes)
+        return original(pdf_bytes)
+
+    from PyPDF2 import PdfWriter
+
+    writer = PdfWriter()
+    writer.add_blank_page(width=36, height=36)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    monkeypatch.setattr(utils, "_extract_pdf_pages_pypdf2", counting)
+    monkeypatch.setitem(sys.modules, "pypdfium2", None)
+
+    for _ in range(2):
+        assert utils.load_text_from_upload(_NamedUpload(buffer.getvalue(), "one-page.pdf")) == ""
+
+    assert len(calls) == 1
+    assert utils.load_text_from_upload(_NamedUpload(b"plain", "notes")) == ""
+
+
+def test_load_text_from_upload_decodes_txt_and_leaves_file_open() -> None:
+    upload = _NamedUpload("Line one\r\nCafé \xff".encode("utf-8") + b"\xff", "rules.TXT")
+
+    text = utils.load_text_from_upload(upload)
+
+    assert text == "Line one\r\nCafé \xff"
+    assert not upload.closed
+    assert utils.load_text_from_upload(upload) == text
@@ -1,21 +1,37 @@
-import json
-from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Tuple
+from __future__ import annotations
 
-import pandas as pd
+import csv
+import hashlib
+import io
 import json
-from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Tuple
-
-import pandas as pd
-import streamlit as st
-from docx import Document
-from PyPDF2 import PdfReader
-
-from config import PAGE_TYPE_SCHEMAS
-
-
-@dataclass
+import re
+import threading
+from dataclasses import dataclass
+from functools import lru_cache, partial, singledispatch, wraps
+from operator import attrgetter
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set, Tuple
+
+from config import OUTLINE_SCHEMA, PAGE_TYPE_SCHEMAS
+
+try:  # pragma: no cover - optional dependency for performance
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# pandas, streamlit, pyarrow, python-docx and PyPDF2 are imported inside the
+# functions that use them so importing utils (e.g. for safe_json_loads or
+# build_site_export) does not pay their start-up cost.
+if TYPE_CHECKING:  # pragma: no cover
+    import pandas as pd
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can keep
+# catching the stdlib exception either way. Without orjson, bind one decoder's
+# ``decode`` instead of going through json.loads' per-call argument handling.
+_json_decoder = json.JSONDecoder()
+_json_loads = orjson.loads if orjson is not None else _json_decoder.decode
+
+
+@dataclass(slots=True, frozen=True)
 class BrandInfo:
     name: str
     industry: str
@@ -26,7 +42,7 @@ class BrandInfo:
     notes: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PageDefinition:
     slug: str
     page_name: str
@@ -34,120 +50,309 @@ class PageDefinition:
     service_name: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SEOEntry:
     slug: str
     primary_keyword: Optional[str] = None
-    supporting_keywords: List[str] = field(default_factory=list)
+    # Cleaned, comma-joined keywords ("a,b c"); one str per entry instead of a
+    # tuple of strs. Split on demand via ``supporting_keywords``.
+    supporting_keywords_raw: str = ""
+
+    @property
+    def supporting_keywords(self) -> Tuple[str, ...]:
+        raw = self.supporting_keywords_raw
+        return tuple(raw.split(",")) if raw else ()
 
 
 SEOMap = Dict[str, SEOEntry]
 
+# One comma-separated keyword, already trimmed: starts and ends on a character
+# that is neither a comma nor whitespace, so findall does split+strip+filter.
+# Used for free-text keyword input; CSV columns are cleaned column-wise instead.
+_KEYWORD_RE = re.compile(r"[^,\s](?:[^,]*[^,\s])?")
+
+
+def _upload_bytes(uploaded_file) -> bytes:
+    """Return the raw bytes of an uploaded file without disturbing its position."""
+    if hasattr(uploaded_file, "getvalue"):
+        data = uploaded_file.getvalue()
+    else:
+        uploaded_file.seek(0)
+        data = uploaded_file.read()
+    return data.encode("utf-8") if isinstance(data, str) else data
+
+
+def _digest_bytes(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+UPLOAD_CACHE_MAX_ENTRIES = 32
+
+
+def _cache_data(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Apply ``st.cache_data`` on first call rather than at import time.
+
+    Uploaded file contents are keyed by a BLAKE2b digest, which is cheaper
+    than Streamlit's default hashing of large byte strings. Entries are capped
+    at ``UPLOAD_CACHE_MAX_ENTRIES`` per function; the cache is process-wide, so
+    unbounded it would keep every upload from every session alive.
+    """
+    cached: Optional[Callable[..., Any]] = None
+
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        nonlocal cached
+        if cached is None:
+            import streamlit as st
+
+            cached = st.cache_data(
+                show_spinner=False,
+                max_entries=UPLOAD_CACHE_MAX_ENTRIES,
+                hash_funcs={bytes: _digest_bytes},
+            )(func)
+        return cached(*args, **kwargs)
+
+    return wrapper
+
+
+def _csv_header(file_bytes: bytes) -> List[str]:
+    """Read just the header row so required columns can be checked up front."""
+    first_line = file_bytes.split(b"\n", 1)[0].decode("utf-8-sig")
+    return next(csv.reader([first_line]), [])
+
+
+def _read_csv_columns(file_bytes: bytes, columns: List[str]) -> pd.DataFrame:
+    """Read only ``columns`` from CSV bytes with pandas' C parser.
+
+    Columns come back as strings with blanks kept as "" (no dtype inference,
+    no NaN coercion). Python string storage keeps later ``.str`` regexes on
+    Python's ``re`` even when pandas could back them with Arrow.
+    """
+    import pandas as pd
+
+    return pd.read_csv(
+        io.BytesIO(file_bytes),
+        engine="c",
+        low_memory=False,
+        usecols=columns,
+        dtype=pd.StringDtype("python"),
+        keep_default_na=False,
+    )
+
+
+# Comma-list cleanup as two regex passes (RE2 in Arrow, ``re`` in pandas):
+# collapse each separator run with its surrounding blanks and empty entries to
+# one comma, then drop a comma left at either end. " a , ,b c," -> "a,b c".
+# RE2's \s is ASCII-only, so the Arrow pattern adds \pZ to treat Unicode
+# spaces such as NBSP the way Python's \s and str.strip() do.
+_KEYWORD_SEPARATOR_PATTERN = r"\s*,[\s,]*"
+_ARROW_KEYWORD_SEPARATOR_PATTERN = r"[\s\pZ]*,[\s\pZ,]*"
+_KEYWORD_EDGE_PATTERN = r"^,|,$"
+
+
+def _read_csv_string_columns(
+    file_bytes: bytes, columns: List[str], keyword_columns: Tuple[str, ...] = ()
+) -> List[List[str]]:
+    """Read ``columns`` as stripped strings, straight from Arrow when available.
+
+    ``keyword_columns`` hold comma-separated lists and come back normalized to
+    "kw1,kw2" (trimmed entries, blanks dropped) by vectorized string kernels.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        pa_csv = None
+
+    table = None
+    if pa_csv is not None:
+        # Arrow rejects rows with fewer fields than the header, which hand-edited
+        # CSVs produce by leaving off trailing empty cells. Note them instead of
+        # failing; the pandas read below fills their missing cells with "".
+        short_rows: List[int] = []
+
+        def _on_invalid_row(row: Any) -> str:
+            if row.actual_columns < row.expected_columns:
+                short_rows.append(row.number)
+                return "skip"
+            return "error"
+
+        table = pa_csv.read_csv(
+            io.BytesIO(file_bytes),
+            parse_options=pa_csv.ParseOptions(
+                newlines_in_values=True, invalid_row_handler=_on_invalid_row
+            ),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=columns,
+                column_types=dict.fromkeys(columns, pa.string()),
+            ),
+        )
+        if short_rows:
+            table = None
+
+    if table is not None:
+        # Null-fill, trim and clean keyword lists column-wise in Arrow's C++
+        # kernels; Python only sees the final clean strings.
+        values = []
+        for col in columns:
+            array = pc.utf8_trim_whitespace(pc.fill_null(table.column(col), ""))
+            if col in keyword_columns:
+                array = pc.replace_substring_regex(array, _ARROW_KEYWORD_SEPARATOR_PATTERN, ",")
+                array = pc.replace_substring_regex(array, _KEYWORD_EDGE_PATTERN, "")
+            values.append(array.to_pylist())
+        return values
+
+    df = _read_csv_columns(file_bytes, columns)
+    values = []
+    for col in columns:
+        series = df[col].str.strip()
+        if col in keyword_columns:
+            series = series.str.replace(_KEYWORD_SEPARATOR_PATTERN, ",", regex=True).str.replace(
+                _KEYWORD_EDGE_PATTERN, "", regex=True
+            )
+        values.append(series.tolist())
+    return values
+
 
 def parse_seo_csv(uploaded_file) -> Tuple[SEOMap, List[str]]:
     """
     Parse the uploaded SEO CSV into a SEOMap keyed by slug.
     CSV must contain at least: slug, primary_keyword, supporting_keywords.
     Returns (seo_map, warnings).
+
+    Parsing is cached on the file contents, so Streamlit reruns with the same
+    upload skip the CSV work entirely.
     """
+    if uploaded_file is None:
+        return {}, []
+
+    return _parse_seo_csv_bytes(_upload_bytes(uploaded_file))
+
+
+@_cache_data
+def _parse_seo_csv_bytes(file_bytes: bytes) -> Tuple[SEOMap, List[str]]:
     seo_map: SEOMap = {}
     warnings: List[str] = []
 
-    if uploaded_file is None:
-        return seo_map, warnings
-
+    required_cols = ["slug", "primary_keyword", "supporting_keywords"]
     try:
-        df = pd.read_csv(uploaded_file)
+        missing = set(required_cols) - set(_csv_header(file_bytes))
+        if missing:
+            warnings.append(
+                f"SEO CSV is missing required columns: {', '.join(sorted(missing))}"
+            )
+            return seo_map, warnings
+        # Columnar read without building a DataFrame; supporting keywords are
+        # already cleaned to "kw1,kw2" by the string kernels, so rows are then
+        # walked with a plain zip over the three columns.
+        slugs, primaries, supporting = _read_csv_string_columns(
+            file_bytes, required_cols, keyword_columns=("supporting_keywords",)
+        )
     except Exception as exc:
         warnings.append(f"Failed to parse CSV: {exc}")
         return seo_map, warnings
 
-    required_cols = {"slug", "primary_keyword", "supporting_keywords"}
-    missing = required_cols - set(df.columns)
-    if missing:
-        warnings.append(
-            f"SEO CSV is missing required columns: {', '.join(sorted(missing))}"
-        )
-        return seo_map, warnings
-
-    for _, row in df.iterrows():
-        slug = str(row.get("slug", "")).strip()
-        if not slug:
-            continue
-
-        primary = str(row.get("primary_keyword", "")).strip() or None
-        supporting_raw = str(row.get("supporting_keywords", "")).strip()
-        supporting_list = (
-            [s.strip() for s in supporting_raw.split(",") if s.strip()]
-            if supporting_raw
-            else []
-        )
-
-        seo_map[slug] = SEOEntry(
+    seo_map = {
+        slug: SEOEntry(
             slug=slug,
-            primary_keyword=primary,
-            supporting_keywords=supporting_list,
+            primary_keyword=primary or None,
+            supporting_keywords_raw=supporting_raw,
         )
+        for slug, primary, supporting_raw in zip(slugs, primaries, supporting)
+        if slug
+    }
 
     return seo_map, warnings
 
 
+SITEMAP_COLUMNS = ("slug", "page_name", "page_type")
+SitemapRow = Tuple[str, str, str]
+
+
 def parse_sitemap_csv(
     uploaded_file, allowed_page_types: List[str]
-) -> Tuple[pd.DataFrame, List[str]]:
+) -> Tuple[List[SitemapRow], List[str]]:
     """
-    Parse the uploaded sitemap CSV into a DataFrame with columns:
-        slug, page_name, page_type
+    Parse the uploaded sitemap CSV into (slug, page_name, page_type) records
+    that ``pd.DataFrame.from_records`` can take as-is.
 
     - Ensures required columns exist.
     - Normalizes whitespace.
     - Normalizes page_type to lower case and collapses underscores to spaces.
     - Warns if page_type is not in allowed_page_types.
-    - Returns (df, warnings).
-    """
-    warnings: List[str] = []
+    - Returns (rows, warnings).
 
+    Parsing is cached on the file contents and allowed page types.
+    """
     if uploaded_file is None:
-        return pd.DataFrame(columns=["slug", "page_name", "page_type"]), warnings
+        return [], []
 
-    try:
-        df = pd.read_csv(uploaded_file)
-    except Exception as exc:
-        warnings.append(f"Failed to parse sitemap CSV: {exc}")
-        return pd.DataFrame(columns=["slug", "page_name", "page_type"]), warnings
+    return _parse_sitemap_csv_bytes(_upload_bytes(uploaded_file), tuple(allowed_page_types))
 
-    required_cols = {"slug", "page_name", "page_type"}
-    missing = required_cols - set(df.columns)
-    if missing:
-        warnings.append(
-            f"Sitemap CSV is missing required columns: {', '.join(sorted(missing))}"
-        )
-        return pd.DataFrame(columns=["slug", "page_name", "page_type"]), warnings
 
-    # Normalize and trim
-    df["slug"] = df["slug"].astype(str).str.strip()
-    df["page_name"] = df["page_name"].astype(str).str.strip()
+@lru_cache(maxsize=256)
+def _normalize_page_type(raw: str) -> str:
+    # lower, '_' -> ' ', collapse whitespace runs. The cache means each
+    # distinct raw spelling is normalized once, not per row.
+    return " ".join(raw.lower().replace("_", " ").split())
 
-    # normalize page_type: lower, replace '_' with ' ', collapse multiple spaces
-    def normalize_pt(pt: Any) -> str:
-        s = str(pt).strip().lower().replace("_", " ")
-        # collapse multiple spaces
-        parts = [p for p in s.split(" ") if p]
-        return " ".join(parts)
 
-    df["page_type"] = df["page_type"].apply(normalize_pt)
+@_cache_data
+def _parse_sitemap_csv_bytes(
+    file_bytes: bytes, allowed_page_types: Tuple[str, ...]
+) -> Tuple[List[SitemapRow], List[str]]:
+    rows: List[SitemapRow] = []
+    warnings: List[str] = []
+
+    required_cols = list(SITEMAP_COLUMNS)
+    removed = 0
+    page_types: Set[str] = set()
+    try:
+        reader = csv.reader(io.StringIO(file_bytes.decode("utf-8-sig"), newline=""))
+        header = next(reader, [])
+        missing = set(required_cols) - set(header)
+        if missing:
+            warnings.append(
+                f"Sitemap CSV is missing required columns: {', '.join(sorted(missing))}"
+            )
+            return rows, warnings
+
+        # Only the three required cells are touched per row; other columns in
+        # wide exports are never copied into a per-row dict.
+        slug_idx, name_idx, type_idx = map(header.index, required_cols)
+        width = max(slug_idx, name_idx, type_idx) + 1
+        # Rows are filtered as they stream in, so nothing is built for dropped
+        # rows and there is no second filtering pass; hot callables are bound
+        # to locals for the loop.
+        add_row = rows.append
+        add_type = page_types.add
+        normalize = _normalize_page_type
+        for row in reader:
+            if not row:
+                continue
+            if len(row) < width:
+                row += [""] * (width - len(row))
+            slug = row[slug_idx].strip()
+            page_name = row[name_idx].strip()
+            # Filter out rows without slug or page_name
+            if not slug or not page_name:
+                removed += 1
+                continue
+            page_type = normalize(row[type_idx])
+            add_type(page_type)
+            add_row((slug, page_name, page_type))
+    except Exception as exc:
+        warnings.append(f"Failed to parse sitemap CSV: {exc}")
+        return [], warnings
 
-    # Filter out rows without slug or page_name
-    original_count = len(df)
-    df = df[(df["slug"] != "") & (df["page_name"] != "")]
-    removed = original_count - len(df)
     if removed > 0:
         warnings.append(f"Removed {removed} row(s) with empty slug or page_name.")
 
     # Warn for invalid page types
-    invalid_types = sorted(
-        {pt for pt in df["page_type"].unique() if pt not in allowed_page_types}
-    )
+    # Distinct types were collected during the row pass, so this is a single
+    # set difference over a handful of values rather than a scan of the rows.
+    invalid_types = sorted(page_types.difference(allowed_page_types))
     if invalid_types:
         warnings.append(
             "Found unsupported page_type values in sitemap CSV: "
@@ -156,9 +361,10 @@ def parse_sitemap_csv(
         )
 
     # Keep all rows; UI will let you adjust invalid types via selectbox
-    return df, warnings
+    return rows, warnings
 
 
+@lru_cache(maxsize=16)
 def get_page_schema(page_type: str) -> Dict[str, Any]:
     """
     Retrieve the schema dict for the given page type.
@@ -173,15 +379,25 @@ def safe_json_loads(raw: str) -> Any:
     """
     Safely parse JSON string. If parsing fails, try to extract the first
     top-level JSON object from the string by trimming outside text.
+
+    Results are memoized on the raw string (outline, draft, final and preview
+    passes often re-parse the same model output), so the returned object is
+    shared between callers and must be treated as read-only.
     """
+    return _cached_json_loads(raw)
+
+
+@lru_cache(maxsize=256)
+def _cached_json_loads(raw: str) -> Any:
     try:
-        return json.loads(raw)
+        return _json_loads(raw)
     except json.JSONDecodeError:
         start = raw.find("{")
-        end = raw.rfind("}")
-        if start != -1 and end != -1 and end > start:
+        if start != -1:
+            # raw_decode parses in place from ``start`` and stops after the
+            # first complete object: no slice copy, no rfind over the tail.
             try:
-                return json.loads(raw[start : end + 1])
+                return _json_decoder.raw_decode(raw, start)[0]
             except json.JSONDecodeError:
                 pass
         raise
@@ -191,6 +407,148 @@ class SchemaValidationError(ValueError):
     """Raised when generated JSON does not match the expected schema."""
 
 
+SchemaValidator = Callable[[Any, str], None]
+
+
+# Compiled schema nodes: (_OBJECT, fields) with fields as (key, ".key", node)
+# tuples, (_LIST, item_node_or_None), or (_VALUE,).
+_OBJECT, _LIST, _VALUE = range(3)
+
+
+@singledispatch
+def _compile_node(expected: Any) -> Tuple[Any, ...]:
+    return (_VALUE,)
+
+
+@_compile_node.register
+def _(expected: dict) -> Tuple[Any, ...]:
+    # Reversed so that popping children off the stack visits them in schema
+    # order, keeping the first reported error the same.
+    fields = tuple(
+        (key, f".{key}", _compile_node(sub_schema))
+        for key, sub_schema in reversed(list(expected.items()))
+    )
+    return (_OBJECT, fields)
+
+
+@_compile_node.register
+def _(expected: list) -> Tuple[Any, ...]:
+    return (_LIST, _compile_node(expected[0]) if expected else None)
+
+
+def _node_matches(root: Tuple[Any, ...], payload: Any) -> bool:
+    """Path-free walk of a compiled schema; False at the first mismatch.
+
+    Builds no path strings or exception messages, which makes it the cheap
+    check for the common case where the payload is valid.
+    """
+    stack: List[Tuple[Any, Any]] = [(root, payload)]
+    push = stack.append
+    pop = stack.pop
+    while stack:
+        node, value = pop()
+        kind = node[0]
+        if kind == _OBJECT:
+            if type(value) is not dict and not isinstance(value, dict):
+                return False
+            for key, _suffix, child in node[1]:
+                if key not in value:
+                    return False
+                push((child, value[key]))
+        elif kind == _LIST:
+            if type(value) is not list and not isinstance(value, list):
+                return False
+            item_node = node[1]
+            if item_node is not None:
+                for item in value:
+                    push((item_node, item))
+        elif value is None or (isinstance(value, str) and not value.strip()):
+            return False
+    return True
+
+
+def _compile_validator(expected: Any) -> SchemaValidator:
+    """Turn an exemplar schema into a validator that checks ``(value, path)``."""
+    return _validator_for_node(_compile_node(expected))
+
+
+def _validator_for_node(root: Tuple[Any, ...]) -> SchemaValidator:
+    """Build the raising validator for a compiled schema.
+
+    Valid payloads are accepted by the path-free ``_node_matches`` pass; only
+    on failure is the payload walked again, with paths, to report the first
+    error. Both walks use an explicit stack, so deep payloads cost no Python
+    frames and cannot hit the recursion limit.
+    """
+
+    def validate(payload: Any, path: str = "$") -> None:
+        if _node_matches(root, payload):
+            return
+
+        stack: List[Tuple[Any, Any, str]] = [(root, payload, path)]
+        push = stack.append
+        pop = stack.pop
+        while stack:
+            node, value, current_path = pop()
+            if node is None:
+                # Placeholder pushed for an absent key; ``value`` is the key.
+                raise SchemaValidationError(f"Missing key '{value}' at {current_path}")
+
+            kind = node[0]
+            # Parsed JSON holds exact dicts/lists, so the ``type(...) is`` test
+            # settles almost every node before isinstance is consulted.
+            if kind == _OBJECT:
+                if type(value) is not dict and not isinstance(value, dict):
+                    raise SchemaValidationError(
+                        f"Expected object at {current_path}, got {type(value).__name__}"
+                    )
+                for key, suffix, child in node[1]:
+                    if key in value:
+                        push((child, value[key], current_path + suffix))
+                    else:
+                        push((None, key, current_path))
+            elif kind == _LIST:
+                if type(value) is not list and not isinstance(value, list):
+                    raise SchemaValidationError(
+                        f"Expected list at {current_path}, got {type(value).__name__}"
+                    )
+                item_node = node[1]
+                if item_node is not None:
+                    for idx in range(len(value) - 1, -1, -1):
+                        push((item_node, value[idx], f"{current_path}[{idx}]"))
+            # Primitive exemplar: just ensure presence and non-null value
+            elif value is None or (isinstance(value, str) and not value.strip()):
+                raise SchemaValidationError(
+                    f"Expected non-empty value at {current_path}, got '{value}'"
+                )
+
+    return validate
+
+
+_PAGE_NODES: Dict[str, Tuple[Any, ...]] = {
+    page_type: _compile_node(schema) for page_type, schema in PAGE_TYPE_SCHEMAS.items()
+}
+_PAGE_VALIDATORS: Dict[str, SchemaValidator] = {
+    page_type: _validator_for_node(node) for page_type, node in _PAGE_NODES.items()
+}
+# Keyed by id() of the module-level schema dicts, which stay alive for the
+# process lifetime, so validate_against_schema can reuse them.
+_COMPILED_BY_SCHEMA_ID: Dict[int, SchemaValidator] = {
+    id(OUTLINE_SCHEMA): _compile_validator(OUTLINE_SCHEMA),
+    **{id(PAGE_TYPE_SCHEMAS[pt]): validator for pt, validator in _PAGE_VALIDATORS.items()},
+}
+
+
+def get_page_validator(page_type: str) -> SchemaValidator:
+    """
+    Retrieve the precompiled validator for the given page type.
+    Raises KeyError if not found.
+    """
+    if page_type not in _PAGE_VALIDATORS:
+        raise KeyError(f"Unsupported page type: {page_type}")
+    return _PAGE_VALIDATORS[page_type]
+
+
 def validate_against_schema(schema: Any, payload: Any, path: str = "$") -> None:
     """
     Validate that ``payload`` mirrors the structure of ``schema``.
@@ -198,40 +556,26 @@ def validate_against_schema(schema: Any, payload: Any, path: str = "$") -> None:
     The check is intentionally lightweight and focuses on presence and nesting of
     keys/collections rather than strict typing. Raises SchemaValidationError on
     mismatch to surface actionable feedback to callers before rendering.
-    """
-
-    def _validate(expected: Any, value: Any, current_path: str) -> None:
-        if isinstance(expected, dict):
-            if not isinstance(value, dict):
-                raise SchemaValidationError(
-                    f"Expected object at {current_path}, got {type(value).__name__}"
-                )
-            for key, sub_schema in expected.items():
-                if key not in value:
-                    raise SchemaValidationError(
-                        f"Missing key '{key}' at {current_path}"
-                    )
-                _validate(sub_schema, value[key], f"{current_path}.{key}")
-            return
 
-        if isinstance(expected, list):
-            if not isinstance(value, list):
-                raise SchemaValidationError(
-                    f"Expected list at {current_path}, got {type(value).__name__}"
-                )
-            if expected:
-                exemplar = expected[0]
-                for idx, item in enumerate(value):
-                    _validate(exemplar, item, f"{current_path}[{idx}]")
-            return
+    The config schemas are compiled once at import; any other schema is
+    compiled on the fly.
+    """
+    validator = _COMPILED_BY_SCHEMA_ID.get(id(schema))
+    if validator is None:
+        validator = _compile_validator(schema)
+    validator(payload, path)
 
-        # Primitive exemplar: just ensure presence and non-null value
-        if value is None or (isinstance(value, str) and not value.strip()):
-            raise SchemaValidationError(
-                f"Expected non-empty value at {current_path}, got '{value}'"
-            )
 
-    _validate(schema, payload, path)
+def _seo_export(seo: Optional[SEOEntry]) -> Dict[str, Any]:
+    if seo is None:
+        return {"primary_keyword": None, "supporting_keywords": []}
+    # Split the stored string straight into the list the export needs,
+    # skipping the tuple the supporting_keywords property would build.
+    raw = seo.supporting_keywords_raw
+    return {
+        "primary_keyword": seo.primary_keyword,
+        "supporting_keywords": raw.split(",") if raw else [],
+    }
 
 
 def build_site_export(pages_results: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -246,57 +590,249 @@ def build_site_export(pages_results: List[Dict[str, Any]]) -> Dict[str, Any]:
             "seo": SEOEntry or None,
         }
     """
-    site = {"pages": {}}
-
-    for entry in pages_results:
-        page: PageDefinition = entry["page"]
-        final_json = entry.get("final")
-        seo: Optional[SEOEntry] = entry.get("seo")
-
-        site["pages"][page.slug] = {
-            "page_name": page.page_name,
-            "page_type": page.page_type,
-            "seo": {
-                "primary_keyword": seo.primary_keyword if seo else None,
-                "supporting_keywords": seo.supporting_keywords if seo else [],
-            },
-            "final_copy": final_json,
+    return {
+        "pages": {
+            page.slug: {
+                "page_name": page.page_name,
+                "page_type": page.page_type,
+                "seo": _seo_export(entry.get("seo")),
+                "final_copy": entry.get("final"),
+            }
+            for entry in pages_results
+            for page in (entry["page"],)
         }
+    }
+
+
+def export_bytes(payload: Any) -> bytes:
+    """Serialize an export payload to indented UTF-8 JSON bytes for download."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+    return json.dumps(payload, indent=2).encode("utf-8")
+
+
+
+
+_SERVICE_SECTION_KEYS: Tuple[str, ...] = (
+    "problem_section",
+    "solution_section",
+    "benefits_section",
+    "process_section",
+    "faq_section",
+    "final_cta_section",
+)
+
+# Top-level section keys per page-type schema (see config.PAGE_TYPE_SCHEMAS),
+# in display order. Home pages keep their sections in a "sections" list instead.
+_SECTION_KEYS: Dict[str, Tuple[str, ...]] = {
+    "service": _SERVICE_SECTION_KEYS,
+    "sub service": _SERVICE_SECTION_KEYS,
+    "about": (
+        "brand_story",
+        "team_section",
+        "values_section",
+        "credibility_section",
+        "final_cta_section",
+    ),
+    "location": (
+        "local_intro",
+        "services_summary",
+        "neighborhood_specific_details",
+        "trust_signals",
+        "local_faqs",
+        "final_cta_section",
+    ),
+}
+
+_ITEM_LIST_KEYS: Tuple[str, ...] = ("items", "members", "values", "services")
+_ITEM_LABEL_KEYS: Tuple[str, ...] = ("label", "question", "name")
+_ITEM_DETAIL_KEYS: Tuple[str, ...] = ("description", "answer", "bio", "quote")
+_HERO_HEADLINE_KEYS: Tuple[str, ...] = ("headline", "eyebrow")
+# Fields pulled from one dict in a single ``map(obj.get, ...)`` destructure.
+_STEP_FIELDS: Tuple[str, ...] = ("step_number", "title", "description")
+_STEP_DEFAULTS: Tuple[str, ...] = ("", "", "")
+_MEDICAL_SECTION_FIELDS: Tuple[str, ...] = ("heading", "body", "target_word_count")
+# Top-level keys that identify the MEDICAL_PAGE_SCHEMA shape.
+_MEDICAL_PAGE_KEYS = frozenset({"sections", "hero", "meta"})
+# Every key _render_schema_section reads; intersecting with it tells us in one
+# C-level set operation which parts a section actually has.
+_SECTION_SUBKEYS = frozenset(
+    {"title", "id", "intro", "body", "bullets", "steps", "primary_cta_label", *_ITEM_LIST_KEYS}
+)
+
+
+def _first(data: Dict[str, Any], keys: Tuple[str, ...], default: Any = "") -> Any:
+    """Return the first truthy value in ``data`` among ``keys``."""
+    get = data.get
+    for key in keys:
+        value = get(key)
+        if value:
+            return value
+    return default
+
+
+def _schema_section_markdown(section: Dict[str, Any]) -> str:
+    """Markdown for one section of a page-type schema (title, copy, lists, CTA)."""
+    present = section.keys() & _SECTION_SUBKEYS
+    if not present:
+        return ""
+
+    parts: List[str] = []
+    title = section.get("title") or section.get("id")
+    if title:
+        parts.append(f"### {title}")
+    if "intro" in present and section["intro"]:
+        parts.append(str(section["intro"]))
+    if "body" in present and section["body"]:
+        parts.append(str(section["body"]))
+
+    if "bullets" in present and section["bullets"]:
+        parts.append("\n".join(f"- {bullet}" for bullet in section["bullets"]))
+
+    steps = (
+        [step for step in section["steps"] or [] if isinstance(step, dict)]
+        if "steps" in present
+        else []
+    )
+    if steps:
+        parts.append(
+            "\n".join(
+                "{}. **{}** — {}".format(*map(step.get, _STEP_FIELDS, _STEP_DEFAULTS))
+                for step in steps
+            )
+        )
+
+    item_lines = []
+    for list_key in _ITEM_LIST_KEYS:
+        if list_key not in present:
+            continue
+        for item in section[list_key] or []:
+            if not isinstance(item, dict):
+                continue
+            label = _first(item, _ITEM_LABEL_KEYS)
+            detail = _first(item, _ITEM_DETAIL_KEYS)
+            item_lines.append(f"- **{label}** {detail}".rstrip())
+    if item_lines:
+        parts.append("\n".join(item_lines))
 
-    return site
+    if "primary_cta_label" in present and section["primary_cta_label"]:
+        parts.append(f"**CTA:** {section['primary_cta_label']}")
 
+    return "\n\n".join(parts)
 
 
+def _hero_markdown(hero_block: Dict[str, Any], cta_key: str) -> List[str]:
+    parts: List[str] = []
+    headline, eyebrow, subheadline, cta = map(
+        hero_block.get, (*_HERO_HEADLINE_KEYS, "subheadline", cta_key)
+    )
+    hero_headline = headline or eyebrow
+    if hero_headline:
+        parts.append(f"## {hero_headline}")
+    if subheadline:
+        parts.append(str(subheadline))
+    if cta:
+        parts.append(f"**CTA:** {cta}")
+    return parts
+
+
+def _medical_page_markdown(page_type: str, page_json: Dict[str, Any]) -> List[str]:
+    """Markdown for the MEDICAL_PAGE_SCHEMA shape (hero + meta + sections list)."""
+    parts = [f"**Page type:** {page_json.get('page_type', page_type)}"]
+    parts.extend(_hero_markdown(page_json.get("hero", {}), "primary_cta"))
+
+    for section in page_json.get("sections") or ():
+        heading, body, target_words = map(section.get, _MEDICAL_SECTION_FIELDS)
+        parts.append(f"### {heading or section.get('id', 'Section')}")
+        if body:
+            parts.append(str(body))
+        if target_words:
+            parts.append(f"_Target words: {target_words}_")
+    return parts
+
+
+def _section_list_markdown(page_json: Dict[str, Any]) -> List[str]:
+    """Markdown for schemas that keep their sections in a "sections" list (home)."""
+    return [
+        _schema_section_markdown(section)
+        for section in page_json.get("sections") or []
+        if isinstance(section, dict)
+    ]
+
+
+def _keyed_sections_markdown(
+    page_json: Dict[str, Any], section_keys: Tuple[str, ...]
+) -> List[str]:
+    """Markdown for schemas that keep each section under its own top-level key."""
+    sections = map(page_json.get, section_keys)
+    return [_schema_section_markdown(section) for section in sections if isinstance(section, dict)]
+
+
+# page_type -> body renderer for config.PAGE_TYPE_SCHEMAS shapes, built once.
+_RENDERERS: Dict[str, Callable[[Dict[str, Any]], List[str]]] = {
+    "home": _section_list_markdown,
+    **{
+        page_type: partial(_keyed_sections_markdown, section_keys=section_keys)
+        for page_type, section_keys in _SECTION_KEYS.items()
+    },
+}
+
 
 def render_page_preview(page_type: str, page_json: Dict[str, Any]) -> None:
-    """Render a human-readable preview of the structured JSON."""
+    """Render a human-readable preview of the structured JSON.
+
+    The whole page is assembled into one markdown string so Streamlit sends a
+    single element instead of one per heading, paragraph and caption.
+    """
+    import streamlit as st
+
     if not page_json:
         st.info("No final JSON available for this page.")
         return
 
-    if "sections" in page_json and "hero" in page_json and "meta" in page_json:
-        st.markdown(f"**Page type:** {page_json.get('page_type', page_type)}")
-        hero_block = page_json.get("hero", {})
-        hero_headline = hero_block.get("headline") or hero_block.get("eyebrow")
-        if hero_headline:
-            st.subheader(hero_headline)
-        if hero_block.get("subheadline"):
-            st.write(hero_block["subheadline"])
-        if hero_block.get("primary_cta"):
-            st.markdown(f"**CTA:** {hero_block['primary_cta']}")
-
-        for section in page_json.get("sections", []):
-            heading = section.get("heading") or section.get("id", "Section")
-            st.markdown(f"### {heading}")
-            if section.get("body"):
-                st.write(section["body"])
-            if section.get("target_word_count"):
-                st.caption(f"Target words: {section['target_word_count']}")
-        return
+    if isinstance(page_json, dict) and _MEDICAL_PAGE_KEYS <= page_json.keys():
+        parts = _medical_page_markdown(page_type, page_json)
+    else:
+        renderer = _RENDERERS.get(page_type, _section_list_markdown)
+        if not isinstance(page_json, dict) or "hero" not in page_json or (
+            renderer is _section_list_markdown and not isinstance(page_json.get("sections"), list)
+        ):
+            st.info("Preview unavailable: JSON does not match expected schema.")
+            return
+        parts = _hero_markdown(page_json["hero"] or {}, "primary_cta_label")
+        parts.extend(renderer(page_json))
+
+    markdown = "\n\n".join(part for part in parts if part)
+    if markdown:
+        st.markdown(markdown)
+
+
+def _extract_pdf_pages_pypdf2(pdf_bytes: bytes) -> List[str]:
+    from PyPDF2 import PdfReader
 
-    st.info("Preview unavailable: JSON does not match expected schema.")
+    pdf_reader = PdfReader(io.BytesIO(pdf_bytes))
+    return [page.extract_text() or "" for page in pdf_reader.pages]
 
 
+# PDFium keeps process-wide state and is not thread-safe even across separate
+# documents. Streamlit runs each session's script on its own thread, so every
+# call into it (open, page iteration, close) is serialized here.
+_PDFIUM_LOCK = threading.Lock()
+
+
+def _extract_pdf_pages_pdfium(pdfium: Any, pdf_bytes: bytes) -> List[str]:
+    with _PDFIUM_LOCK:
+        document = pdfium.PdfDocument(pdf_bytes)
+        try:
+            pages_text = []
+            for page in document:
+                textpage = page.get_textpage()
+                pages_text.append(textpage.get_text_range().replace("\r\n", "\n"))
+                textpage.close()
+                page.close()
+            return pages_text
+        finally:
+            document.close()
 
 
 def load_text_from_upload(uploaded_file) -> str:
@@ -304,24 +840,40 @@ def load_text_from_upload(uploaded_file) -> str:
     if uploaded_file is None:
         return ""
 
-    name = (uploaded_file.name or "").lower()
-
-    try:
-        uploaded_file.seek(0)
-    except Exception:
-        pass
+    _, dot, extension = (uploaded_file.name or "").lower().rpartition(".")
+    if not dot or extension not in ("txt", "docx", "pdf"):
+        return ""
 
-    if name.endswith(".txt"):
+    if extension == "txt":
+        # Decoding is cheaper than hashing and pickling for the cache, so text
+        # files skip it.
+        try:
+            uploaded_file.seek(0)
+        except Exception:
+            pass
         return uploaded_file.read().decode("utf-8", errors="ignore")
 
-    if name.endswith(".docx"):
-        document = Document(uploaded_file)
-        return "\n".join(p.text for p in document.paragraphs)
+    # Streamlit reruns the script on every interaction; extraction (PDFs in
+    # particular) only runs again when the uploaded bytes change.
+    return _load_text_from_bytes(extension, _upload_bytes(uploaded_file))
+
 
-    if name.endswith(".pdf"):
+@_cache_data
+def _load_text_from_bytes(extension: str, data: bytes) -> str:
+    if extension == "docx":
+        from docx import Document
+
+        document = Document(io.BytesIO(data))
+        return "\n".join(map(attrgetter("text"), document.paragraphs))
+
+    if extension == "pdf":
         try:
-            pdf_reader = PdfReader(uploaded_file)
-            pages_text = [page.extract_text() or "" for page in pdf_reader.pages]
+            try:  # pragma: no cover - optional dependency for performance
+                import pypdfium2 as pdfium
+            except ImportError:  # pragma: no cover
+                pages_text = _extract_pdf_pages_pypdf2(data)
+            else:
+                pages_text = _extract_pdf_pages_pdfium(pdfium, data)
             return "\n".join(pages_text).strip()
         except Exception:
             return ""
@@ -333,18 +885,10 @@ def parse_keywords(raw: str) -> List[str]:
     """Parse comma or newline-separated keywords into a clean list."""
     if not raw:
         return []
-    parts = [
-        piece.strip()
-        for line in raw.splitlines()
-        for piece in line.split(",")
-        if piece.strip()
-    ]
-    # Deduplicate while preserving order
-    seen = set()
-    deduped = []
-    for kw in parts:
-        if kw.lower() in seen:
-            continue
-        seen.add(kw.lower())
-        deduped.append(kw)
-    return deduped
+    # Deduplicate case-insensitively in the same pass, keeping the first
+    # spelling seen; dicts preserve insertion order.
+    deduped: Dict[str, str] = {}
+    for line in raw.splitlines():
+        for kw in _KEYWORD_RE.findall(line):
+            deduped.setdefault(kw.casefold(), kw)
+    return list(deduped.values())